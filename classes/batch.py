@@ -0,0 +1,141 @@
+import json
+import time
+import fnmatch
+import logging
+
+from .ghutils import Ghutils
+from .records import RepositoryRecord
+
+logger = logging.getLogger(__name__)
+
+
+class RepoBatch:
+    """
+    Fetches what the reports need from many repositories at once - one GraphQL query with an
+    aliased `repository(owner:, name:)` block per repository. The number of repositories per
+    query adapts: it grows while queries are cheap and quick, and shrinks when they fail or get slow.
+    """
+    def __init__(self, paths: list, commits: int = 30, batch_size: int = 20, max_batch_size: int = 100,
+                 max_cost: int = 50, target_seconds: float = 5):
+        """
+        Args:
+            paths ([]str): The files to get from the default branch of each repository
+            commits (int): The number of recent commits to get from each repository. Default: 30
+            batch_size (int): The number of repositories in the first query. Default: 20
+            max_batch_size (int): The largest number of repositories in one query. Default: 100
+            max_cost (int): The GraphQL rate limit cost a query may have before the batches stop growing. Default: 50
+            target_seconds (float): A query slower than this makes the batches shrink. Default: 5
+        """
+        self.paths = paths
+        self.commits = commits
+        self.batch_size = batch_size
+        self.max_batch_size = max_batch_size
+        self.max_cost = max_cost
+        self.target_seconds = target_seconds
+        self.queries = 0
+
+    def query(self, count: int):
+        """
+        Args:
+            count (int): The number of repositories in the query
+        Returns:
+            str: The GraphQL query for `count` repositories - named by the variables $o<n> and $n<n>
+        """
+        files = "\n".join(f"    f{index}: object(expression: {json.dumps('HEAD:' + path)}) {{ ... on Blob {{ isTruncated text }} }}"
+                          for index, path in enumerate(self.paths))
+        block = f'''  r{{n}}: repository(owner: $o{{n}}, name: $n{{n}}) {{
+    name description url pushedAt
+    owner {{ login url }}
+    open_issues: issues(states: OPEN) {{ totalCount }}
+    closed_issues: issues(states: CLOSED) {{ totalCount }}
+    open_prs: pullRequests(states: OPEN) {{ totalCount }}
+    closed_prs: pullRequests(states: [CLOSED, MERGED]) {{ totalCount }}
+{files}
+    defaultBranchRef {{ target {{ ... on Commit {{ history(first: {self.commits}) {{ nodes {{
+      oid message committedDate author {{ name email user {{ login }} }}
+    }} }} }} }} }}
+  }}'''
+        variables = ", ".join(f"$o{n}: String!, $n{n}: String!" for n in range(count))
+        blocks = "\n".join(block.replace("{n}", str(n)) for n in range(count))
+        return f"query({variables}) {{\n  rateLimit {{ cost remaining }}\n{blocks}\n}}"
+
+    def to_prefetched(self, full_name: str, data: dict):
+        """
+        Turn a repository block of the response into what Repo() takes as `prefetched`
+        Args:
+            full_name (str): The full name of the repository in the form "org/repo"
+            data (dict): The repository block
+        Returns:
+            dict: 'repo' (as the REST API has it), 'counts', 'files' and 'commits'
+        """
+        owner, name = full_name.split('/', maxsplit=1)
+        history = ((data.get('defaultBranchRef') or {}).get('target') or {}).get('history') or {'nodes': []}
+        return {
+            'repo': {
+                'name': data['name'],
+                'description': data['description'],
+                'html_url': data['url'],
+                'pushed_at': data['pushedAt'],
+                'owner': {'login': data['owner']['login'], 'html_url': data['owner']['url']}},
+            'counts': {key: data[key]['totalCount'] for key in ['open_issues', 'closed_issues', 'open_prs', 'closed_prs']},
+            'files': {path: Ghutils.blob_to_file(owner, name, path, data.get(f"f{index}")) for index, path in enumerate(self.paths)},
+            'commits': [{
+                'sha': node['oid'],
+                'commit': {'message': node['message'], 'author': {'name': node['author']['name'], 'email': node['author']['email'], 'date': node['committedDate']}},
+                'author': node['author']['user']} for node in history['nodes']]}
+
+    def fetch(self, repos: list) -> dict:
+        """
+        Fetch the repositories - a handful of queries instead of several requests per repository
+        Args:
+            repos ([]str): The full names of the repositories in the form "org/repo"
+        Returns:
+            dict: What Repo() takes as `prefetched`, by full name. Repositories that couldn't be fetched are left out
+        """
+        results = {}
+        pending = list(dict.fromkeys(repos))
+        while pending:
+            chunk = pending[:self.batch_size]
+            variables = {}
+            for n, full_name in enumerate(chunk):
+                variables[f"o{n}"], variables[f"n{n}"] = full_name.split('/', maxsplit=1)
+            started = time.time()
+            returncode, data = Ghutils.query_graphql(self.query(len(chunk)), variables, False)
+            elapsed = time.time() - started
+            self.queries += 1
+
+            if returncode != 0:
+                if len(chunk) == 1:
+                    # Leave it to Repo() to fetch this one on its own
+                    logger.warning(f"{chunk[0]}: {data}")
+                    pending = pending[1:]
+                else:
+                    self.batch_size = max(1, len(chunk) // 2)
+                continue
+
+            for n, full_name in enumerate(chunk):
+                if data.get(f"r{n}") is not None:
+                    results[full_name] = self.to_prefetched(full_name, data[f"r{n}"])
+            pending = pending[len(chunk):]
+
+            cost = (data.get('rateLimit') or {}).get('cost', 1)
+            if elapsed > self.target_seconds:
+                self.batch_size = max(1, self.batch_size // 2)
+            elif elapsed < self.target_seconds / 2 and cost < self.max_cost:
+                self.batch_size = min(self.max_batch_size, self.batch_size * 3 // 2 + 1)
+        return results
+
+    @staticmethod
+    def discover(owner: str, pattern: str = '*') -> list:
+        """
+        Find the repositories of an organization - or a user
+        Args:
+            owner (str): The organization or user
+            pattern (str): Only the repositories with a name matching this glob, e.g. "Wishlist*" - case is ignored. Default: "*"
+        Returns:
+            []str: The full names of the repositories, sorted
+        """
+        returncode, repos = Ghutils.query_github_allpages(f"orgs/{owner}/repos?type=all", False, RepositoryRecord)
+        if returncode != 0:
+            _,repos = Ghutils.query_github_allpages(f"users/{owner}/repos?type=owner", record=RepositoryRecord)
+        return sorted(repo['full_name'] for repo in repos if fnmatch.fnmatch(repo['name'].lower(), pattern.lower()))
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+
+from .transport import Transport, Response, Headers
+
+
+class ResponseCache:
+    """
+    A persistent cache of GitHub API responses, kept in a SQLite file and keyed by API path.
+    Entries younger than `ttl` are used as they are. Older entries are revalidated with
+    `If-None-Match`/`If-Modified-Since` - a 304 doesn't count against the rate limit.
+    """
+    def __init__(self, path: str, ttl: float = 60, max_age: float = 7*24*3600, max_bytes: int = 256*1024*1024):
+        """
+        Args:
+            path (str): The SQLite file. Its directory is created if needed
+            ttl (float): Seconds an entry is used without asking GitHub. Default: 60
+            max_age (float): Seconds an entry is kept after it was last confirmed by GitHub. Default: 7 days
+            max_bytes (int): The maximum size of the stored (compressed) bodies. The least recently used entries are evicted first. Default: 256 MB
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.__lock, self.__db:
+            self.__db.execute("PRAGMA journal_mode=WAL")
+            self.__db.execute('''CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, status INTEGER, reason TEXT, headers TEXT, body BLOB,
+                etag TEXT, last_modified TEXT, stored_at REAL, accessed_at REAL, size INTEGER)''')
+            self.__db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self.__db.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - max_age,))
+            self.__size = self.__db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def default_dir():
+        """
+        Returns:
+            str: $XDG_CACHE_HOME/reporeport - or ~/.cache/reporeport
+        """
+        return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'reporeport')
+
+    def get(self, key: str):
+        """
+        Args:
+            key (str): The API path
+        Returns:
+            Response, float: The cached response and the time GitHub last confirmed it. None, None if it isn't cached
+        """
+        with self.__lock:
+            row = self.__db.execute(
+                "SELECT status, reason, headers, body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None, None
+            with self.__db:
+                self.__db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        status, reason, headers, body, stored_at = row
+        return Response(status, reason, Headers(json.loads(headers)), zlib.decompress(body).decode('utf-8')), stored_at
+
+    def put(self, key: str, response: Response):
+        """
+        Store a response - only responses that can be revalidated are worth keeping
+        Args:
+            key (str): The API path
+            response (Response): The response
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag is None and last_modified is None:
+            return
+        body = zlib.compress(response.body.encode('utf-8'))
+        now = time.time()
+        with self.__lock, self.__db:
+            old = self.__db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.__db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.status, response.reason, json.dumps(response.headers), body,
+                 etag, last_modified, now, now, len(body)))
+            self.__size += len(body) - (old[0] if old else 0)
+            if self.__size > self.max_bytes:
+                self.__evict()
+
+    def confirm(self, key: str):
+        """
+        Mark a cached response as confirmed by GitHub (it answered 304 Not Modified)
+        Args:
+            key (str): The API path
+        """
+        with self.__lock, self.__db:
+            self.__db.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+    @property
+    def size(self):
+        return self.__size
+
+    def __evict(self):
+        # Drop the least recently used entries until there's some room below the limit
+        target = self.max_bytes * 0.9
+        for key, size in self.__db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if self.__size <= target:
+                break
+            self.__db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.__size -= size
+
+    def close(self):
+        with self.__lock:
+            self.__db.close()
+
+
+class CachingTransport(Transport):
+    """
+    Puts a ResponseCache in front of another transport. Only plain GET requests are cached.
+    """
+    def __init__(self, transport: Transport, cache: ResponseCache):
+        self.transport = transport
+        self.cache = cache
+
+    def request(self, method: str, path: str, body: str = None, headers: dict = None) -> Response:
+        if method != 'GET' or body is not None:
+            return self.transport.request(method, path, body, headers)
+
+        cached, confirmed_at = self.cache.get(path)
+        if cached is not None and time.time() - confirmed_at < self.cache.ttl:
+            cached.cache = 'hit'
+            return cached
+
+        request_headers = dict(headers or {})
+        if cached is not None and 'ETag' in cached.headers:
+            request_headers['If-None-Match'] = cached.headers['ETag']
+        if cached is not None and 'Last-Modified' in cached.headers:
+            request_headers['If-Modified-Since'] = cached.headers['Last-Modified']
+        response = self.transport.request(method, path, body, request_headers)
+
+        if response.status == 304 and cached is not None:
+            self.cache.confirm(path)
+            # The body is the cached one, the headers (rate limit etc.) are the fresh ones
+            cached.headers.update(response.headers)
+            cached.cache = 'revalidated'
+            return cached
+        if response.ok:
+            self.cache.put(path, response)
+        response.cache = 'miss'
+        return response
+
+    def close(self):
+        self.transport.close()
+        self.cache.close()
@@ -0,0 +1,247 @@
+import re
+import posixpath
+
+
+class CodeOwnersRule:
+    """
+    A line of a CODEOWNERS file: a pattern and its owners - no owners means the paths are left unowned
+    """
+    __slots__ = ('line', 'pattern', 'owners', 'index', 'anchored', 'directory', 'children_only', 'regex')
+
+    def __init__(self, line: int, pattern: str, owners: list, index: int):
+        self.line = line
+        self.pattern = pattern
+        self.owners = owners
+        # The position among the rules - the rule with the highest index matching a path wins
+        self.index = index
+        body = pattern[1:] if pattern.startswith('/') else pattern
+        # "docs/" only matches directories - and so everything in them
+        self.directory = body.endswith('/')
+        body = body.rstrip('/')
+        # A slash at the start or in the middle ties the pattern to the root, otherwise it matches at any depth
+        self.anchored = pattern.startswith('/') or '/' in body
+        # "docs/*" matches the files in docs, but - unlike in .gitignore - not the ones further down
+        self.children_only = body.endswith('/*')
+        self.regex = re.compile(CodeOwnersRule.translate(body) + r'\Z')
+
+    @staticmethod
+    def translate(pattern: str) -> str:
+        """
+        Returns:
+            str: A regular expression for a pattern - "*" and "?" stay within a directory, "**" crosses them
+        """
+        regex = []
+        position = 0
+        while position < len(pattern):
+            if pattern.startswith('**/', position):
+                regex.append('(?:.*/)?')
+                position += 3
+            elif pattern.startswith('/**', position) and position + 3 == len(pattern):
+                regex.append('/.*')
+                position += 3
+            elif pattern.startswith('**', position):
+                regex.append('.*')
+                position += 2
+            elif pattern[position] == '*':
+                regex.append('[^/]*')
+                position += 1
+            elif pattern[position] == '?':
+                regex.append('[^/]')
+                position += 1
+            elif pattern[position] == '\\' and position + 1 < len(pattern):
+                regex.append(re.escape(pattern[position + 1]))
+                position += 2
+            else:
+                regex.append(re.escape(pattern[position]))
+                position += 1
+        return ''.join(regex)
+
+    def matches(self, path: str, is_directory: bool) -> bool:
+        """
+        Args:
+            path (str): A path relative to the root, without a leading slash
+            is_directory (bool): Whether the path is a directory
+        Returns:
+            bool: Whether the pattern matches the path itself - the files of a matched directory aren't checked here
+        """
+        if self.directory and not is_directory or self.children_only and is_directory:
+            return False
+        # A pattern without a slash is matched against the name alone
+        return self.regex.match(path if self.anchored else path.rsplit('/', 1)[-1]) is not None
+
+    def __repr__(self):
+        return f"CodeOwnersRule(line={self.line}, pattern={self.pattern!r}, owners={self.owners!r})"
+
+
+class CodeOwners:
+    """
+    A CODEOWNERS file compiled for matching many paths: the rules are sorted into dictionaries by
+    what they can match - the exact path, the name at any depth ("apps/", "**/logs"), the end of the
+    name, everything. Globs with a literal directory in front are only tried below it, and the rest
+    are combined into one regular expression - matched once per name where the name alone decides.
+    What the directories match is worked out once per directory and shared by the files in them.
+    The last matching rule wins.
+
+    Like GitHub, no "!" negation and no "[ ]" ranges - lines using them are kept in `errors`.
+    """
+    # An owner: @user, @org/team or an email address
+    owner_pattern = re.compile(r"^(@[\w\-]+(/[\w\-.]+)?|[^@\s]+@[^@\s]+)$")
+
+    def __init__(self, text: str):
+        """
+        Args:
+            text (str): The content of the CODEOWNERS file
+        """
+        self.rules = []
+        self.errors = []
+        for number, line in enumerate(text.split('\n'), start=1):
+            # A "#" starts a comment - unless it's escaped
+            line = re.split(r"(?<!\\)#", line, maxsplit=1)[0].strip()
+            if not line:
+                continue
+            pattern, *owners = line.split()
+            if pattern.startswith('!') or '[' in pattern.replace('\\[', ''):
+                self.errors.append((number, line, 'Negation and character ranges are not supported'))
+                continue
+            invalid = [owner for owner in owners if not CodeOwners.owner_pattern.match(owner)]
+            if invalid:
+                self.errors.append((number, line, f"Invalid owner: {invalid[0]}"))
+                continue
+            self.rules.append(CodeOwnersRule(number, pattern, owners, len(self.rules)))
+        self.__compile()
+
+    def __compile(self):
+        # What each kind of rule is looked up by - the lists are in the order of the rules
+        self.__paths = {}       # "/docs/", "src/main.c": the path
+        self.__names = {}       # "apps/", "Makefile", "**/logs": the name - at any depth, or with more to check
+        self.__suffixes = {}    # "*.js", "*_test.go", "/src/**/*.c": the end of the name
+        self.__everything = []  # "*", "**", "/**"
+        self.__prefixed = {}    # "/docs/*", "/src/v?/": the glob, by the literal directory in front of it
+        globs = []              # "*.min.*", "*/build-*/": the rest - tried all at once, see __combine()
+        for rule in self.rules:
+            body = rule.pattern.lstrip('/').rstrip('/')
+            name = body.rsplit('/', 1)[-1]
+            wildcard = re.search(r"[*?\\]", body)
+            if body in ('*', '**') and not rule.directory:
+                self.__everything.append(rule)
+            elif wildcard is None:
+                (self.__paths if rule.anchored else self.__names).setdefault(body, []).append(rule)
+            elif re.search(r"[*?\\]", name) is None:
+                # "**/logs", "*/build/logs": only paths ending in that name can match - matches() checks the rest
+                self.__names.setdefault(name, []).append(rule)
+            elif name.startswith('*') and len(name) > 1 and re.search(r"[*?\\]", name[1:]) is None:
+                self.__suffixes.setdefault(name[1:], []).append(rule)
+            elif rule.anchored and '/' in body[:wildcard.start()]:
+                self.__prefixed.setdefault(body[:wildcard.start()].rsplit('/', 1)[0], []).append(rule)
+            else:
+                globs.append(rule)
+        self.__suffix_lengths = sorted({len(suffix) for suffix in self.__suffixes}, reverse=True)
+        # By whether the path is a directory: the globs matched against the name, and those matched against the path
+        self.__globs = {is_directory: (CodeOwners.__combine([rule for rule in globs if not rule.anchored], is_directory),
+                                       CodeOwners.__combine([rule for rule in globs if rule.anchored], is_directory))
+                        for is_directory in (False, True)}
+        # The names repeat much more than the paths - what the globs matched against the name alone say is kept
+        self.__name_globs = {}
+        self.__directories = {'': None}
+
+    @staticmethod
+    def __combine(rules: list, is_directory: bool):
+        """
+        One regular expression for many globs - the last rule comes first, so the alternative that matches is the one that wins
+        """
+        rules = [rule for rule in rules if not (rule.directory and not is_directory or rule.children_only and is_directory)]
+        if not rules:
+            return None
+        return re.compile("|".join(f"(?P<r{rule.index}>{rule.regex.pattern})" for rule in reversed(rules)))
+
+    def __best(self, path: str, is_directory: bool, best):
+        """
+        The last rule matching the path itself - if it comes after `best`
+        """
+        def consider(rules):
+            nonlocal best
+            # The lists are in order - only the last match counts
+            for rule in reversed(rules):
+                if best is not None and rule.index <= best.index:
+                    return
+                if rule.matches(path, is_directory):
+                    best = rule
+                    return
+
+        name = path.rsplit('/', 1)[-1]
+        consider(self.__everything)
+        consider(self.__paths.get(path, ()))
+        consider(self.__names.get(name, ()))
+        for length in self.__suffix_lengths:
+            if length <= len(name):
+                consider(self.__suffixes.get(name[len(name) - length:], ()))
+        directory = path
+        while '/' in directory:
+            directory = directory.rsplit('/', 1)[0]
+            consider(self.__prefixed.get(directory, ()))
+        by_name, by_path = self.__globs[is_directory]
+        if by_name is not None:
+            if (name, is_directory) not in self.__name_globs:
+                match = by_name.match(name)
+                self.__name_globs[name, is_directory] = self.rules[int(match.lastgroup[1:])] if match is not None else None
+            rule = self.__name_globs[name, is_directory]
+            if rule is not None and (best is None or rule.index > best.index):
+                best = rule
+        if by_path is not None and (match := by_path.match(path)) is not None and (best is None or int(match.lastgroup[1:]) > best.index):
+            best = self.rules[int(match.lastgroup[1:])]
+        return best
+
+    def __directory(self, directory: str):
+        """
+        The rule owning everything in a directory - the last one matching it or a directory above it
+        """
+        if directory not in self.__directories:
+            parent = directory.rsplit('/', 1)[0] if '/' in directory else ''
+            self.__directories[directory] = self.__best(directory, True, self.__directory(parent))
+        return self.__directories[directory]
+
+    def rule_for(self, path: str):
+        """
+        Args:
+            path (str): The path of a file, relative to the root
+        Returns:
+            CodeOwnersRule: The rule deciding who owns the file - None if no rule matches
+        """
+        path = path.lstrip('/')
+        return self.__best(path, False, self.__directory(posixpath.dirname(path)))
+
+    def owners(self, path: str) -> list:
+        """
+        Returns:
+            []str: The owners of a file - empty if it has none
+        """
+        rule = self.rule_for(path)
+        return rule.owners if rule is not None else []
+
+    def coverage(self, paths) -> dict:
+        """
+        Match every file of a repository
+        Args:
+            paths ([]str): The paths of the files
+        Returns:
+            dict: 'files' - the number of files, 'unowned' - the paths without owners, 'dead_rules' - the rules
+                deciding no file, 'owners' - the number of files by owner, most first, and 'errors' - the lines skipped
+        """
+        decided = [0] * len(self.rules)
+        unowned = []
+        files = 0
+        for path in paths:
+            files += 1
+            rule = self.rule_for(path)
+            if rule is not None:
+                decided[rule.index] += 1
+            if rule is None or not rule.owners:
+                unowned.append(path)
+        owners = {}
+        for rule in self.rules:
+            for owner in rule.owners:
+                owners[owner] = owners.get(owner, 0) + decided[rule.index]
+        return {'files': files, 'unowned': unowned,
+                'dead_rules': [rule for rule in self.rules if decided[rule.index] == 0],
+                'owners': dict(sorted(owners.items(), key=lambda item: -item[1])),
+                'errors': self.errors}
@@ -0,0 +1,78 @@
+import sys
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from .ghutils import Ghutils
+from .records import CollaboratorRecord
+
+
+class CollaboratorAudit:
+    """
+    Lists who has access to repositories - all pages of GitHub's collaborators API, several
+    repositories at the same time. A repository that fails is reported, the rest of them go on.
+    """
+    # The output formats: the rows of each repository are written as soon as it - and the ones before it - are done
+    formats = ['text', 'ndjson', 'tsv']
+
+    def __init__(self, affiliation: str = 'direct', jobs: int = 8):
+        """
+        Args:
+            affiliation (str): "direct", "outside" or "all" - which collaborators GitHub lists. Default: direct
+            jobs (int): The number of repositories fetched at the same time. Default: 8
+        """
+        self.affiliation = affiliation
+        self.jobs = jobs
+
+    def collaborators(self, full_name: str):
+        """
+        Args:
+            full_name (str): The repository in the form "org/repo"
+        Returns:
+            on success:
+            int, []CollaboratorRecord: 0 and the collaborators
+
+            on error:
+            int, str: The return code and the error message
+        """
+        return Ghutils.query_github_allpages(f"repos/{full_name}/collaborators?affiliation={self.affiliation}", False, CollaboratorRecord)
+
+    @staticmethod
+    def rows(full_name: str, returncode: int, result, format: str):
+        """
+        Returns:
+            []str: The lines written for a repository
+        """
+        if returncode != 0:
+            return [json.dumps({'repo': full_name, 'error': result})] if format == 'ndjson' else []
+        if format == 'ndjson':
+            return [json.dumps({'repo': full_name, 'login': collaborator.login, 'html_url': collaborator.html_url, 'role': collaborator.role_name})
+                    for collaborator in result]
+        if format == 'tsv':
+            return [f"{full_name}\t{collaborator.login}\t{collaborator.html_url}\t{collaborator.role_name or ''}" for collaborator in result]
+        # The lines the old `chat` script printed
+        return [f"{full_name} {collaborator.html_url} {collaborator.login}" for collaborator in result]
+
+    def run(self, repos: list, out=None, format: str = 'text') -> int:
+        """
+        Audit the repositories and write a line per collaborator - in the order of `repos`
+        Args:
+            repos ([]str): The repositories in the form "org/repo"
+            out (file): Where the lines are written. Default: sys.stdout
+            format (str): One of formats. Default: text
+        Returns:
+            int: The number of repositories that failed
+        """
+        out = out or sys.stdout
+        failed = 0
+        if format == 'tsv':
+            out.write("repo\tlogin\thtml_url\trole\n")
+        with ThreadPoolExecutor(max_workers=max(1, self.jobs)) as executor:
+            # map() hands back the repositories in order, while the later ones are fetched
+            for full_name, (returncode, result) in zip(repos, executor.map(self.collaborators, repos)):
+                if returncode != 0:
+                    failed += 1
+                    print(f"Error: {full_name} failed - {result}", file=sys.stderr)
+                for row in CollaboratorAudit.rows(full_name, returncode, result, format):
+                    out.write(row + "\n")
+                out.flush()
+        return failed
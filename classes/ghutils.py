@@ -1,36 +1,21 @@
-import json
 import os
+import json
 import re
 import sys
 import subprocess
+import time
 import logging
-import inspect
-from io import StringIO
-
-# Add directory of this class to the general class_path
-# to allow import of sibling classes
-class_path = os.path.dirname(os.path.abspath(__file__))
-sys.path.append(class_path)
-
-# Configure logging
-import logging
+import operator
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# Configure logging for the log file
-file_handler = logging.FileHandler('logs/app.log')
-file_handler.setLevel(logging.DEBUG)
-
-# Define the log formatter
-log_formatter = logging.Formatter('\n%(asctime)s - %(levelname)s\n  Name: %(name)s\n  Function: %(funcName)s()\n  Module: %(module)s\n  File: %(filename)s(%(lineno)d)\n%(message)s', '%Y-%m-%d %H:%M:%S')
-
-
-
-file_handler.setFormatter(log_formatter)
+from .transport import Transport, Response, Headers
+from .repofile import RepoFile
+from .reportwriter import ReportWriter
+from .stats import Stats
+from .records import Record
 
 logger = logging.getLogger(__name__)
-logger.addHandler(file_handler)
-
-logging.basicConfig(filename='logs/app.log', level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s', date_format='%Y-%m-%d %H:%M:%S')
-
 
 
 class Ghutils:
@@ -40,32 +25,155 @@ class Ghutils:
   about_contributing_url =  "https://docs.github.com/en/communities/setting-up-your-project-for-healthy-contributions/setting-guidelines-for-repository-contributors"
   about_license_url =       "https://docs.github.com/en/communities/setting-up-your-project-for-healthy-contributions/adding-a-license-to-a-repository"
   gitginore_templates_url = "https://github.com/github/gitignore"
-  __buffer = StringIO()
-  __buffer2 = StringIO()
-  
+  # Each thread builds its own report, so the report writers are kept per thread
+  __local = threading.local()
+  __transport = None
+  page_size = 100
+  max_page_workers = 8
+  __transport_lock = threading.Lock()
+  # Profiles of GitHub users, shared by all reports built in this process - as (looked up at, profile) by login
+  users_per_query = 50
+  # Seconds a profile is used before it's looked up again - None to keep it as long as the process runs
+  user_cache_ttl = None
+  __users = {}
+  __users_lock = threading.Lock()
+
+  @staticmethod
+  def setup_logging(log_file: str = 'logs/app.log', level: int = logging.DEBUG):
+      """
+      Log to a file - nothing is logged until this is called
+      Args:
+          log_file (str): The log file. Its directory is created if needed. Default: logs/app.log
+          level (int): The lowest level logged. Default: logging.DEBUG
+      """
+      if os.path.dirname(log_file):
+          os.makedirs(os.path.dirname(log_file), exist_ok=True)
+      file_handler = logging.FileHandler(log_file)
+      file_handler.setLevel(level)
+      file_handler.setFormatter(logging.Formatter('\n%(asctime)s - %(levelname)s\n  Name: %(name)s\n  Function: %(funcName)s()\n  Module: %(module)s\n  File: %(filename)s(%(lineno)d)\n%(message)s', '%Y-%m-%d %H:%M:%S'))
+      root = logging.getLogger()
+      root.addHandler(file_handler)
+      root.setLevel(min(root.level, level))
+
+  @staticmethod
+  def set_transport(transport: Transport):
+      """
+      Set the transport all requests to GitHub's API are sent through
+      Args:
+          transport (Transport): The transport. None means the default transport
+      """
+      Ghutils.__transport = transport
+
+  @staticmethod
+  def get_transport() -> Transport:
+      """
+      Returns:
+          Transport: The transport in use - the default transport is created on first use
+      """
+      if Ghutils.__transport is None:
+          with Ghutils.__transport_lock:
+              if Ghutils.__transport is None:
+                  Ghutils.__transport = Transport.default()
+      return Ghutils.__transport
+
+  @staticmethod
+  def request(method: str, ghapi: str, body: str = None, headers: dict = None) -> Response:
+      """
+      Send a request to GitHub's API through the current transport
+      Args:
+          method (str): The HTTP method
+          ghapi (str): The API path
+          body (str): The request body. Default: None
+          headers (dict): Additional request headers. Default: None
+      Returns:
+          Response: The response. If GitHub couldn't be reached the status is 0
+      """
+      started = time.perf_counter() if Stats.enabled else None
+      try:
+          response = Ghutils.get_transport().request(method, ghapi, body, headers)
+      except OSError as e:
+          response = Response(0, f"gh: {e}", Headers(), '')
+      if started is not None:
+          Stats.record_request(method, ghapi, started, response)
+      return response
+
+  @staticmethod
+  def __writer() -> ReportWriter:
+      if getattr(Ghutils.__local, 'writer', None) is None:
+          Ghutils.__local.writer = ReportWriter()
+      return Ghutils.__local.writer
+
+  @staticmethod
+  def open_report(sink=None) -> ReportWriter:
+      """
+      Start a new report in the current thread - print_to_buffer() and print_to_buffer2() write to it
+      Args:
+          sink (file): Where the report is streamed to. Default: a spooled temporary file
+      Returns:
+          ReportWriter: The writer of the report
+      """
+      Ghutils.reset_buffers()
+      Ghutils.__local.writer = ReportWriter(sink)
+      return Ghutils.__local.writer
+
+  @staticmethod
+  def take_report() -> ReportWriter:
+      """
+      Finish the current thread's report and hand it over - the thread starts on a new one next time
+      Returns:
+          ReportWriter: The writer of the report. The caller must close it
+      """
+      writer = Ghutils.__writer()
+      writer.finish()
+      Ghutils.__local.writer = None
+      return writer
+
+  @staticmethod
+  def reset_buffers():
+      """
+      Discard whatever the current thread has written to its report and start over with an empty one
+      """
+      if getattr(Ghutils.__local, 'writer', None) is not None:
+          Ghutils.__local.writer.close()
+      Ghutils.__local.writer = None
+
   @staticmethod
   def print_to_buffer(content):
-      print(content, file=Ghutils.__buffer)
+      Ghutils.__writer().write(f"{content}\n")
 
   @staticmethod
   def print_to_buffer2(content):
-      print(content, file=Ghutils.__buffer2)
+      Ghutils.__writer().write_appendix(f"{content}\n")
       
   @staticmethod
   def merge_buffers():
-      Ghutils.__buffer.write(Ghutils.__buffer2.getvalue())
-      Ghutils.__buffer2.close()
+      Ghutils.__writer().finish()
+
+  @staticmethod
+  def buffer_to_string():
+      """
+      Returns the current thread's report and starts on a new one
+      Returns:
+          str: The report
+      """
+      writer = Ghutils.take_report()
+      content = writer.read()
+      writer.close()
+      return content
       
   @staticmethod
   def buffer_to_stdout():
-      print(Ghutils.__buffer.getvalue())
-      Ghutils.__buffer.close()
+      writer = Ghutils.take_report()
+      writer.copy_to(sys.stdout)
+      print()
+      writer.close()
       
   @staticmethod
   def buffer_to_file(location: str = "reporeport.md"):
+      writer = Ghutils.take_report()
       with open(location, "w") as f:
-          f.write(Ghutils.__buffer.getvalue())
-      Ghutils.__buffer.close()
+          writer.copy_to(f)
+      writer.close()
 
   @staticmethod
   def get_org_repo_from_current_directory():
@@ -100,45 +208,107 @@ class Ghutils:
     Returns:
         int: count of elements in json where key=value
     """
-    return sum(1 for element in json if element[key] == value)  
+    if json and isinstance(json[0], Record):
+        # Records keep their fields as attributes - no dict lookups
+        return sum(1 for element_value in map(operator.attrgetter(key), json) if element_value == value)
+    return sum(1 for element in json if element[key] == value)
 
   @staticmethod
-  def query_github_allpages(ghapi: str, die_on_error: bool = True):
+  def query_github_allpages(ghapi: str, die_on_error: bool = True, record: type = None):
       """
       Query GitHub's API and compiles the result from all pages if there's more than one.
       More details at https://docs.github.com/en/rest
       Args:
           ghapi (str): The API to query GitHub
           die_on_error: If True, exit the program on error. Default: True
+          record (type): A Record subclass - each page is turned into records of it as soon as it arrives. Default: None - the JSON is kept as it is
       Returns:
           on success:
-          int, []json: The return code from the query and the JSON output
+          int, []json: The return code from the query and the JSON output - or []Record
   
           on error:
           int, str: The return code from the query and the error message
       """
-      page = 1
-      page_size = 100  # Adjust the desired page size here
       json_return = []
-      
-      # Append page size and page number to the original API call
-      api_url = f"{ghapi}&per_page={page_size}&page={page}"
-      
-      # Let the first run die on error (essentially let query_github() handle the error
-      _,json_part = Ghutils.query_github(api_url, True)
-      
-      # Compile the final result
-      json_return.extend(json_part)
-      
-      # Continue if the page was full
-      while len(json_part) == page_size:
-          page += 1 # Move to the next page
-          api_url = f"{ghapi}&per_page={page_size}&page={page}"
-          _,json_part = Ghutils.query_github(api_url, False) #Ignore the error - will handle it by checking the length of the json
+      for returncode, json_part in Ghutils.iter_pages(ghapi, die_on_error, record):
+          if returncode != 0:
+              return returncode, json_part
           json_return.extend(json_part)
-      
       return 0,json_return
 
+  @staticmethod
+  def page_url(ghapi: str, page: int):
+      """
+      Args:
+          ghapi (str): The API to query GitHub
+          page (int): The page number
+      Returns:
+          str: The API with page size and page number appended
+      """
+      separator = '&' if '?' in ghapi else '?'
+      return f"{ghapi}{separator}per_page={Ghutils.page_size}&page={page}"
+
+  @staticmethod
+  def iter_pages(ghapi: str, die_on_error: bool = True, record: type = None):
+      """
+      Query GitHub's API and yield the pages one by one, in order, as soon as they are available.
+      The Link header of the first page tells how many pages there are - the rest of them are then fetched concurrently.
+      Args:
+          ghapi (str): The API to query GitHub
+          die_on_error: If True, exit the program on error. Default: True
+          record (type): A Record subclass to project each page to - the rest of the JSON is let go right away. Default: None
+      Yields:
+          on success:
+          int, []json: The return code from the query and the JSON output of a page - or []Record
+
+          on error:
+          int, str: The return code from the query and the error message - it's the last thing yielded
+      """
+      def project(returncode, json_part):
+          return (returncode, record.project(json_part)) if record is not None and returncode == 0 else (returncode, json_part)
+
+      returncode, json_part, headers = Ghutils.query_github_incl_header(Ghutils.page_url(ghapi, 1), die_on_error)
+      page_length = len(json_part) if returncode == 0 else 0
+      yield project(returncode, json_part)
+      if returncode != 0:
+          return
+
+      if 'Link' in headers:
+          last_page = Ghutils.get_total_count_from_header(headers['Link'])
+          if last_page == 0:
+              # No rel="last" - cursor-paginated endpoints only tell the next page, so follow them one by one
+              next_page = Ghutils.get_next_page_from_header(headers['Link'])
+              while next_page is not None:
+                  returncode, json_part, headers = Ghutils.query_github_incl_header(next_page, die_on_error)
+                  yield project(returncode, json_part)
+                  if returncode != 0:
+                      return
+                  next_page = Ghutils.get_next_page_from_header(headers.get('Link') or '')
+              return
+          if last_page < 2:
+              return
+          executor = ThreadPoolExecutor(max_workers=min(Ghutils.max_page_workers, last_page - 1))
+          try:
+              # map() hands back the pages in order, even when a later page arrives first.
+              # Each page is projected in its worker, so only the records wait in line
+              for returncode, json_part in executor.map(
+                      lambda page: project(*Ghutils.query_github(Ghutils.page_url(ghapi, page), die_on_error)), range(2, last_page + 1)):
+                  yield returncode, json_part
+                  if returncode != 0:
+                      return
+          finally:
+              executor.shutdown(wait=False, cancel_futures=True)
+      else:
+          # Without a Link header continue as long as the pages are full
+          page = 1
+          while page_length == Ghutils.page_size:
+              page += 1
+              returncode, json_part = Ghutils.query_github(Ghutils.page_url(ghapi, page), die_on_error)
+              page_length = len(json_part) if returncode == 0 else 0
+              yield project(returncode, json_part)
+              if returncode != 0:
+                  return
+
   @staticmethod
   def query_github(ghapi:str, die_on_error:bool=True):
       """
@@ -154,20 +324,14 @@ class Ghutils:
           on error:
           int,str: The returncode from the query and the error message
       """
-      try:
-          # Call the GitHub API
-          response = subprocess.run(
-              ['gh', 'api', ghapi], capture_output=True, text=True, check=True)
-          
-          # Parse the JSON output of the API call
-          
-          return response.returncode,json.loads(response.stdout)
-      except subprocess.CalledProcessError as e:
-          if die_on_error:
-              print(f"Error: {e.stderr} {ghapi}", file=sys.stderr)
-              sys.exit(1)
-          else:
-              return e.returncode, f"Error: {e.stderr} {ghapi}" 
+      response = Ghutils.request('GET', ghapi)
+      if response.ok:
+          return 0,response.json()
+      if die_on_error:
+          print(f"Error: {response.error} {ghapi}", file=sys.stderr)
+          sys.exit(1)
+      else:
+          return 1, f"Error: {response.error} {ghapi}"
 
   @staticmethod
   def query_github_incl_header(ghapi:str, die_on_error:bool=True):
@@ -184,45 +348,161 @@ class Ghutils:
           on error:
           int,str: The returncode from the query and the error message
       """
-      logger.info(Ghutils.get_function_realtime_reader())
-      
-      try:
-          # Call the GitHub API
-          response = subprocess.run(
-              ['gh', 'api', "-i", ghapi], capture_output=True, text=True, check=True)
-          
-          # Parse the JSON output of the API call
-          
-          separator_index = response.stdout.find('\n\n')
-          rawheader = response.stdout[:separator_index]
-          body = json.loads(response.stdout[separator_index + 2:])  
+      response = Ghutils.request('GET', ghapi)
+      headers = Headers(response.headers)
+      headers["Status-Code"] = str(response.status) if response.status else None
+      if response.ok:
+          headers["Status-Text"] = f"{response.status} {response.reason}"
+          return 0,response.json(),headers
+      if die_on_error:
+          print(f"Error: {response.error} {ghapi}", file=sys.stderr)
+          sys.exit(1)
+      else:
+          return 1, f"Error: {response.error} {ghapi}", headers
+
+
+  @staticmethod
+  def query_graphql(query: str, variables: dict = None, die_on_error: bool = True):
+      """
+      Query GitHub's GraphQL API.
+      More details at https://docs.github.com/en/graphql
+      Args:
+          query (str): The GraphQL query
+          variables (dict): The values of the variables used in the query. Default: None
+          die_on_error: If True, exit the program on error. Default: True
+      Returns:
+          on success:
+          int,json: The returncode from the query and the `data` of the response. Parts of it may be null
+          if GitHub reported errors for them
           
-          headers = {}
-          for line in rawheader.strip().split("\n"):
-              if ":" in line:
-                  key, value = line.split(":", 1)
-                  headers[key.strip()] = value.strip()
+          on error:
+          int,str: The returncode from the query and the error message
+      """
+      response = Ghutils.request('POST', 'graphql', json.dumps({'query': query, 'variables': variables or {}}))
+      body = response.json() if response.ok else None
+      if body is not None and body.get('data') is not None:
+          if body.get('errors'):
+              logger.debug(body['errors'])
+          return 0,body['data']
+      error = response.error if not response.ok else '; '.join(error.get('message', '') for error in body.get('errors', []))
+      if die_on_error:
+          print(f"Error: {error} graphql", file=sys.stderr)
+          sys.exit(1)
+      else:
+          return 1, f"Error: {error} graphql"
+
+  @staticmethod
+  def clear_user_cache():
+      """
+      Forget the user profiles looked up so far
+      """
+      with Ghutils.__users_lock:
+          Ghutils.__users.clear()
+
+  @staticmethod
+  def get_users(logins: list) -> dict:
+      """
+      Get the profiles of GitHub users. Users not seen before in this process - or longer than
+      `user_cache_ttl` ago - are looked up in batches of `users_per_query` with one GraphQL query per batch.
+      Args:
+          logins ([]str): The logins of the users
+      Returns:
+          dict: The profiles ({'login', 'name'}) by login
+      """
+      now = time.monotonic()
+      with Ghutils.__users_lock:
+          cached = {login: Ghutils.__users[login][1] for login in logins if login in Ghutils.__users
+                    and (Ghutils.user_cache_ttl is None or now - Ghutils.__users[login][0] < Ghutils.user_cache_ttl)}
+      missing = list(dict.fromkeys(login for login in logins if login not in cached))
+
+      found = {}
+      for start in range(0, len(missing), Ghutils.users_per_query):
+          chunk = missing[start:start + Ghutils.users_per_query]
+          query = "query({}) {{\n{}\n}}".format(
+              ", ".join(f"$u{index}: String!" for index in range(len(chunk))),
+              "\n".join(f"u{index}: user(login: $u{index}) {{ login name }}" for index in range(len(chunk))))
+          returncode, data = Ghutils.query_graphql(query, {f"u{index}": login for index, login in enumerate(chunk)}, False)
+          for index, login in enumerate(chunk):
+              if returncode == 0 and data.get(f"u{index}") is not None:
+                  found[login] = data[f"u{index}"]
+      for login in missing:
+          if login not in found:
+              # Bots and the like aren't users in GraphQL - the REST API knows them
+              returncode, user = Ghutils.query_github(f"users/{login}", False)
+              found[login] = user if returncode == 0 else {'login': login, 'name': None}
+
+      with Ghutils.__users_lock:
+          Ghutils.__users.update((login, (now, user)) for login, user in found.items())
+      return {login: found[login] if login in found else cached[login] for login in logins}
+
+  @staticmethod
+  def blob_to_file(owner: str, repo: str, path: str, blob: dict):
+      """
+      Turn a GraphQL `object(expression:) { ... on Blob { isTruncated text } }` into a RepoFile
+      Args:
+          owner (str): The owner of the repository
+          repo (str): The name of the repository
+          path (str): The path of the file
+          blob (dict): The object from the GraphQL response
+      Returns:
+          RepoFile: The file - None if it doesn't exist
+      """
+      if not blob:
+          # Missing - or a directory, which isn't a Blob
+          return None
+      if blob.get('text') is None or blob.get('isTruncated'):
+          # Binary or too big to come along - get it from the REST API if it's needed
+          return RepoFile(path, loader=lambda: Ghutils.query_github(f'repos/{owner}/{repo}/contents/{path}')[1])
+      return RepoFile(path, blob['text'])
+
+  @staticmethod
+  def get_files(owner: str, repo: str, paths: list) -> dict:
+      """
+      Get files from the default branch of a repository - all of them in one GraphQL query.
+      Args:
+          owner (str): The owner of the repository
+          repo (str): The name of the repository
+          paths ([]str): The paths of the files
+      Returns:
+          dict: A RepoFile by path - None for the files that don't exist
+      """
+      query = "query($owner: String!, $name: String!, {}) {{\n  repository(owner: $owner, name: $name) {{\n{}\n  }}\n}}".format(
+          ", ".join(f"$f{index}: String!" for index in range(len(paths))),
+          "\n".join(f"    f{index}: object(expression: $f{index}) {{ ... on Blob {{ isTruncated text }} }}" for index in range(len(paths))))
+      variables = {'owner': owner, 'name': repo}
+      variables.update({f"f{index}": f"HEAD:{path}" for index, path in enumerate(paths)})
+
+      files = {}
+      returncode, data = Ghutils.query_graphql(query, variables, False)
+      if returncode == 0 and data.get('repository') is not None:
+          for index, path in enumerate(paths):
+              files[path] = Ghutils.blob_to_file(owner, repo, path, data['repository'].get(f"f{index}"))
+          return files
+
+      # Without GraphQL ask for the files one by one - but all at the same time
+      with ThreadPoolExecutor(max_workers=len(paths) or 1) as executor:
+          results = executor.map(lambda path: Ghutils.query_github(f'repos/{owner}/{repo}/contents/{path}', False), paths)
+          for path, (returncode, contents) in zip(paths, results):
+              if returncode != 0 or not isinstance(contents, dict):
+                  files[path] = None
               else:
-                  if line.startswith("HTTP/"):
-                      # split on the first space
-                      headers["Status-Text"] = line.split(" ", 1)[1]
-                      headers["Status-Code"] = line.split(" ", 2)[1]
-                      
-          
-          
-          return response.returncode,body,headers
-      
-      except subprocess.CalledProcessError as e:
-          if die_on_error:
-              print(f"Error: {e.stderr} {ghapi}", file=sys.stderr)
-              sys.exit(1)
-          else:
-              error_message = e.stderr
-              header = {}
-              header["Status-Code"] = re.search(r"HTTP (\d+)", error_message).group(1) if re.search(r"HTTP (\d+)", error_message) else None
- 
-              return e.returncode, f"Error: {e.stderr} {ghapi}", header 
+                  files[path] = RepoFile(path, loader=lambda contents=contents: contents)
+      return files
 
+  @staticmethod
+  def get_tree(owner: str, repo: str):
+      """
+      Get the paths of all files on the default branch of a repository - in one request.
+      Args:
+          owner (str): The owner of the repository
+          repo (str): The name of the repository
+      Returns:
+          []str, bool: The paths, and whether GitHub cut the list short (over 100,000 entries or 7 MB) - None, None on error
+      """
+      returncode, tree = Ghutils.query_github(f'repos/{owner}/{repo}/git/trees/HEAD?recursive=1', False)
+      if returncode != 0 or not isinstance(tree, dict):
+          return None, None
+      return [entry['path'] for entry in tree.get('tree', []) if entry.get('type') == 'blob'], tree.get('truncated', False)
 
   @staticmethod
   def get_element_by_regex(json:json,key:str,search:str):
@@ -240,40 +520,79 @@ class Ghutils:
             None    
     """
     regex = re.compile(search)
+    if json and isinstance(json[0], Record):
+        for element in json:
+            value = getattr(element, key)
+            if value is not None and regex.search(value):
+                return element
+        return None
     for element in json:
         if key in element and regex.search(element[key]):
             return element
     return None
 
   @staticmethod
-  def get_pull_request_counts(owner: str, repo: str):
-      try:
-          open_prs_url = f"repos/{owner}/{repo}/pulls?state=open"
-          closed_prs_url = f"repos/{owner}/{repo}/pulls?state=closed"
-  
-          open_prs_response = subprocess.run(
-              ['gh', 'api', open_prs_url], capture_output=True, text=True, check=True
-          )
-          open_prs_count = Ghutils.get_total_count_from_header(open_prs_response.stdout)
-  
-          closed_prs_response = subprocess.run(
-              ['gh', 'api', closed_prs_url], capture_output=True, text=True, check=True
-          )
-          closed_prs_count = Ghutils.get_total_count_from_header(closed_prs_response.stdout)
-  
-          return open_prs_count, closed_prs_count
-  
-      except subprocess.CalledProcessError as e:
-          print(f"Error: {e.stderr}", file=sys.stderr)
-          sys.exit(1)
-  
+  def get_issue_pr_counts(owner: str, repo: str) -> dict:
+      """
+      Count the open and closed issues and PRs of a repository - without fetching them.
+      One GraphQL query - or four searches if GraphQL fails - no matter how many there are.
+      Args:
+          owner (str): The owner of the repository
+          repo (str): The name of the repository
+      Returns:
+          dict: The counts as 'open_issues', 'closed_issues', 'open_prs' and 'closed_prs'. Closed PRs include the merged ones
+      """
+      query = '''query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    open_issues: issues(states: OPEN) { totalCount }
+    closed_issues: issues(states: CLOSED) { totalCount }
+    open_prs: pullRequests(states: OPEN) { totalCount }
+    closed_prs: pullRequests(states: [CLOSED, MERGED]) { totalCount }
+  }
+}'''
+      returncode, data = Ghutils.query_graphql(query, {'owner': owner, 'name': repo}, False)
+      if returncode == 0 and data.get('repository') is not None:
+          return {key: value['totalCount'] for key, value in data['repository'].items()}
+
+      counts = {}
+      for key, qualifiers in [('open_issues', 'is:issue+is:open'), ('closed_issues', 'is:issue+is:closed'),
+                              ('open_prs', 'is:pr+is:open'), ('closed_prs', 'is:pr+is:closed')]:
+          _,result = Ghutils.query_github(f"search/issues?q=repo:{owner}/{repo}+{qualifiers}&per_page=1")
+          counts[key] = result['total_count']
+      return counts
+
   @staticmethod
   def get_total_count_from_header(header: str) -> int:
-      match = re.search(r"page=1>; rel=\"last\", .* page=(\d+)", header)
-      if match:
-          return int(match.group(1))
+      """
+      Get the number of the last page from a Link header
+      Args:
+          header (str): The value of the Link header
+      Returns:
+          int: The number of the last page, 0 if there is no rel="last" link
+      """
+      for link in header.split(','):
+          match = re.search(r'<([^>]*)>;\s*rel="last"', link)
+          if match:
+              pages = re.findall(r"[?&]page=(\d+)", match.group(1))
+              if pages:
+                  return int(pages[-1])
       return 0
   
+  @staticmethod
+  def get_next_page_from_header(header: str):
+      """
+      Get the next page from a Link header
+      Args:
+          header (str): The value of the Link header
+      Returns:
+          str: The API of the next page, relative to the API's root like the ones passed to query_github - None if there is no rel="next" link
+      """
+      for link in header.split(','):
+          match = re.search(r'<([^>]*)>;\s*rel="next"', link)
+          if match:
+              return re.sub(r"^https?://[^/]+/(api/v3/)?", "", match.group(1))
+      return None
+
   @staticmethod
   def parse_response_header(header: str) -> dict:
       headers = {}
@@ -285,6 +604,7 @@ class Ghutils:
   
   @staticmethod
   def get_function_realtime_reader():
+      import inspect
       frame = inspect.currentframe().f_back
       args, _, _, values = inspect.getargvalues(frame)
       function_name = frame.f_code.co_name
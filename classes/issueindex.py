@@ -0,0 +1,53 @@
+import os
+import json
+import tempfile
+import threading
+
+
+class IssueIndex:
+    """
+    The number of the report issue of each repository - kept in a JSON file, so the issue
+    doesn't have to be searched for every time a report is published.
+    """
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The JSON file
+        """
+        self.path = path
+        self.__lock = threading.Lock()
+
+    def __load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # No index - or a broken one - is as good as an empty one
+            return {}
+
+    def get(self, full_name: str):
+        """
+        Args:
+            full_name (str): The repository in the form "org/repo"
+        Returns:
+            int: The number of its report issue - None if it isn't known
+        """
+        with self.__lock:
+            return self.__load().get(full_name)
+
+    def set(self, full_name: str, number: int = None):
+        """
+        Remember - or with number None forget - the report issue of a repository
+        """
+        with self.__lock:
+            # Read again before writing, so the numbers other processes saved meanwhile are kept
+            index = self.__load()
+            if number is None:
+                index.pop(full_name, None)
+            else:
+                index[full_name] = number
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(self.path) or '.', suffix='.tmp', delete=False) as f:
+                json.dump(index, f, indent=1, sort_keys=True)
+            os.replace(f.name, self.path)
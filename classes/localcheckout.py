@@ -0,0 +1,221 @@
+import os
+import re
+import json
+import time
+import tempfile
+import datetime
+import subprocess
+
+from .repofile import RepoFile
+
+
+class LocalCheckout:
+    """
+    A clone of the repository on this machine. What git already has - the community files and
+    the commits per author - is read from it instead of GitHub's API. A shallow clone, as CI
+    checkouts are by default, has only the last commits: check `shallow` before counting them.
+    """
+    # GitHub's noreply addresses: "<login>@users.noreply.github.com" or "<id>+<login>@users.noreply.github.com"
+    noreply_pattern = re.compile(r"^(?:\d+\+)?([A-Za-z0-9-]+(?:\[bot\])?)@users\.noreply\.github\.com$", re.IGNORECASE)
+    # The owner and name of a repository in the URL of a remote on github.com - https or ssh
+    remote_pattern = re.compile(r"github\.com[:/]([^/]+)/([^/]+?)(?:\.git)?/?$")
+
+    def __init__(self, path: str = '.', worktree: bool = False):
+        """
+        Args:
+            path (str): A directory in the clone. Default: the current directory
+            worktree (bool): Read the files from the working tree instead of the last commit (HEAD). Default: False
+        """
+        self.path = path
+        self.worktree = worktree
+        self.root = self.git('rev-parse', '--show-toplevel').strip()
+        self.shallow = self.git('rev-parse', '--is-shallow-repository').strip() == 'true'
+        # The logins found by contributors(), by email address
+        self.logins = {}
+
+    def git(self, *args, input: bytes = None, text: bool = True):
+        """
+        Run git in the clone
+        Args:
+            args ([]str): The arguments, e.g. "shortlog", "-sne"
+            input (bytes): What is written to git's stdin. Default: None
+            text (bool): Return the output as str rather than bytes. Default: True
+        Returns:
+            str: The output. Raises subprocess.CalledProcessError if git fails
+        """
+        result = subprocess.run(['git', '-C', self.path] + list(args), input=input, capture_output=True, check=True)
+        return result.stdout.decode('utf-8', errors='replace') if text else result.stdout
+
+    @staticmethod
+    def find(path: str = '.'):
+        """
+        Args:
+            path (str): A directory. Default: the current directory
+        Returns:
+            LocalCheckout: The clone the directory is in - None if it isn't in one
+        """
+        try:
+            return LocalCheckout(path)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def github_repo(self, remote: str = 'origin'):
+        """
+        Args:
+            remote (str): The remote pointing to GitHub. Default: origin
+        Returns:
+            str: The full name of the repository on GitHub in the form "org/repo" - None if the remote isn't on github.com
+        """
+        try:
+            url = self.git('remote', 'get-url', remote).strip()
+        except subprocess.CalledProcessError:
+            return None
+        match = LocalCheckout.remote_pattern.search(url)
+        return f"{match.group(1)}/{match.group(2)}" if match else None
+
+    def files(self, paths: list) -> dict:
+        """
+        Read files of the clone - all of them with one `git cat-file --batch`
+        Args:
+            paths ([]str): The paths, relative to the root of the clone
+        Returns:
+            dict: RepoFile by path - None for the ones that don't exist
+        """
+        if self.worktree:
+            files = {}
+            for path in paths:
+                full_path = os.path.join(self.root, path)
+                if os.path.isfile(full_path):
+                    with open(full_path, encoding='utf-8', errors='replace') as f:
+                        files[path] = RepoFile(path, f.read())
+                else:
+                    files[path] = None
+            return files
+
+        output = self.git('cat-file', '--batch', input="".join(f"HEAD:{path}\n" for path in paths).encode('utf-8'), text=False)
+        files = {}
+        position = 0
+        for path in paths:
+            # Each object is "<sha> <type> <size>\n<content>\n" - or "<name> missing\n"
+            end = output.index(b"\n", position)
+            header = output[position:end].split()
+            position = end + 1
+            if header[-1] == b'missing' or len(header) != 3:
+                files[path] = None
+                continue
+            size = int(header[2])
+            content = output[position:position + size]
+            position += size + 1
+            files[path] = RepoFile(path, content.decode('utf-8', errors='replace')) if header[1] == b'blob' else None
+        return files
+
+    def tree(self) -> list:
+        """
+        Returns:
+            []str: The paths of all files of the last commit (HEAD) - or of the working tree
+        """
+        if self.worktree:
+            output = self.git('-C', self.root, 'ls-files', '-z', '--cached', '--others', '--exclude-standard')
+        else:
+            output = self.git('ls-tree', '-r', '-z', '--name-only', 'HEAD')
+        return [path for path in output.split('\0') if path]
+
+    def contributors(self, commits=None) -> list:
+        """
+        The number of commits per author, from `git shortlog` - the same as GitHub's contributors API, without asking it.
+        An author's login is taken from a noreply address. For other addresses `commits` is asked once, to find
+        the login GitHub linked the address to.
+        Args:
+            commits (callable): Returns commits as GitHub's commits API has them. Default: None - authors without a noreply address aren't linked
+        Returns:
+            []dict: 'login', 'html_url' and 'contributions' of each author, most commits first. Authors that couldn't be
+                linked to a login have 'login' None and their 'name'
+        """
+        authors = []
+        for line in self.git('shortlog', '-sne', 'HEAD').splitlines():
+            match = re.match(r"^\s*(\d+)\t(.*?)\s*<([^>]*)>$", line)
+            if match:
+                authors.append((int(match.group(1)), match.group(2), match.group(3).lower()))
+
+        logins = {}
+        for _, _, email in authors:
+            match = LocalCheckout.noreply_pattern.match(email)
+            if match:
+                logins[email] = match.group(1)
+        if commits is not None and any(email not in logins for _, _, email in authors):
+            for commit in commits() or []:
+                email = ((commit.get('commit') or {}).get('author') or {}).get('email', '').lower()
+                if commit.get('author') and email and email not in logins:
+                    logins[email] = commit['author']['login']
+        self.logins = logins
+
+        contributors = {}
+        for count, name, email in authors:
+            login = logins.get(email)
+            key = login.lower() if login else f"\n{name}"
+            if key not in contributors:
+                contributors[key] = {'login': login, 'html_url': f"https://github.com/{login}" if login else None, 'contributions': 0}
+                if login is None:
+                    contributors[key]['name'] = name
+            contributors[key]['contributions'] += count
+        return sorted(contributors.values(), key=lambda contributor: -contributor['contributions'])
+
+    def history(self, cache_file: str = None) -> dict:
+        """
+        Go through the whole history of HEAD - streamed from `git log --numstat`, so its size doesn't matter.
+        With a cache file only the commits added since the last time are read, unless the history was rewritten.
+        Args:
+            cache_file (str): Where the result is kept between runs. Default: None
+        Returns:
+            dict: 'head' - the commit the history ends with, 'authors' - 'name', 'commits', 'additions' and 'deletions'
+                by email address, 'months' - the number of commits by "YYYY-MM" and 'weeks' - by ISO week "YYYY-Www"
+        """
+        head = self.git('rev-parse', 'HEAD').strip()
+        history = None
+        if cache_file is not None and os.path.exists(cache_file):
+            try:
+                with open(cache_file) as f:
+                    history = json.load(f)
+            except ValueError:
+                history = None
+            if history is not None and 'weeks' not in history:
+                # Kept by an older version - read it all again
+                history = None
+        if history is not None and history.get('head') == head:
+            return history
+        revisions = 'HEAD'
+        if history is not None and subprocess.run(['git', '-C', self.path, 'merge-base', '--is-ancestor', history['head'], head],
+                                                  capture_output=True).returncode == 0:
+            revisions = f"{history['head']}..{head}"
+        else:
+            history = {'head': None, 'authors': {}, 'months': {}, 'weeks': {}}
+
+        process = subprocess.Popen(['git', '-C', self.path, 'log', '--use-mailmap', '--numstat', '--format=%x1e%aE%x1f%aN%x1f%at', revisions],
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, encoding='utf-8', errors='replace')
+        author = None
+        for line in process.stdout:
+            if line.startswith('\x1e'):
+                email, name, timestamp = line[1:].rstrip('\n').split('\x1f')
+                author = history['authors'].setdefault(email.lower(), {'name': name, 'commits': 0, 'additions': 0, 'deletions': 0})
+                author['commits'] += 1
+                month = time.strftime('%Y-%m', time.gmtime(int(timestamp)))
+                history['months'][month] = history['months'].get(month, 0) + 1
+                year, week, _ = datetime.datetime.fromtimestamp(int(timestamp), datetime.timezone.utc).isocalendar()
+                history['weeks'][f"{year}-W{week:02d}"] = history['weeks'].get(f"{year}-W{week:02d}", 0) + 1
+            elif author is not None and line.strip():
+                # "<added>\t<deleted>\t<path>" - binary files have "-" for both
+                added, deleted, _ = line.split('\t', 2)
+                if added != '-':
+                    author['additions'] += int(added)
+                    author['deletions'] += int(deleted)
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, 'git log')
+        history['head'] = head
+
+        if cache_file is not None:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            # Write to a temporary file first, so an interrupted run doesn't leave half a history
+            with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(cache_file), suffix='.tmp', delete=False) as f:
+                json.dump(history, f)
+            os.replace(f.name, cache_file)
+        return history
@@ -0,0 +1,199 @@
+import os
+import time
+import fnmatch
+import sqlite3
+import datetime
+import threading
+
+
+class MetricsStore:
+    """
+    The metrics of every report built - a row per repository and run, kept in a SQLite file.
+    The class-wide summaries and trends are read from it without asking GitHub.
+    """
+    # The counts kept of each run - the columns of the metrics table
+    counts = ['open_issues', 'closed_issues', 'open_prs', 'closed_prs', 'contributors', 'commits']
+    # What `reporeport aggregate` can show
+    views = ['summary', 'missing', 'activity']
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The SQLite file. Its directory is created if needed
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.__lock, self.__db:
+            self.__db.execute("PRAGMA journal_mode=WAL")
+            self.__db.execute(f'''CREATE TABLE IF NOT EXISTS metrics (
+                repo TEXT, recorded_at REAL, {", ".join(f"{count} INTEGER" for count in MetricsStore.counts)}, pushed_at TEXT,
+                PRIMARY KEY (repo, recorded_at))''')
+            self.__db.execute("CREATE INDEX IF NOT EXISTS metrics_recorded_at ON metrics (recorded_at)")
+            self.__db.execute('''CREATE TABLE IF NOT EXISTS community_files (
+                repo TEXT, recorded_at REAL, path TEXT, present INTEGER,
+                PRIMARY KEY (repo, recorded_at, path))''')
+            # Commits per week from the whole history - only known with a mirror or clone, replaced on each run
+            self.__db.execute('''CREATE TABLE IF NOT EXISTS activity (
+                repo TEXT, week TEXT, commits INTEGER,
+                PRIMARY KEY (repo, week))''')
+
+    @staticmethod
+    def week(timestamp: float):
+        """
+        Returns:
+            str: The ISO week of a time, e.g. "2023-W22"
+        """
+        year, week, _ = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).isocalendar()
+        return f"{year}-W{week:02d}"
+
+    def record(self, full_name: str, metrics: dict, recorded_at: float = None):
+        """
+        Add the metrics of a run
+        Args:
+            full_name (str): The repository in the form "org/repo"
+            metrics (dict): What Repo.metrics() returns
+            recorded_at (float): When the metrics were taken. Default: now
+        """
+        recorded_at = time.time() if recorded_at is None else recorded_at
+        with self.__lock, self.__db:
+            self.__db.execute(f"INSERT OR REPLACE INTO metrics VALUES (?, ?, {', '.join('?' for _ in MetricsStore.counts)}, ?)",
+                              (full_name, recorded_at, *(metrics.get(count) for count in MetricsStore.counts), metrics.get('pushed_at')))
+            self.__db.executemany("INSERT OR REPLACE INTO community_files VALUES (?, ?, ?, ?)",
+                                  [(full_name, recorded_at, path, int(present)) for path, present in metrics.get('community_files', {}).items()])
+            if 'commits_per_week' in metrics:
+                self.__db.execute("DELETE FROM activity WHERE repo = ?", (full_name,))
+                self.__db.executemany("INSERT INTO activity VALUES (?, ?, ?)",
+                                      [(full_name, week, commits) for week, commits in metrics['commits_per_week'].items()])
+
+    def repos(self, match: str = '*', repos: list = None) -> list:
+        """
+        Args:
+            match (str): Only the repositories with a full name matching this glob - case is ignored. Default: "*"
+            repos ([]str): Only these repositories. Default: all of them
+        Returns:
+            []str: The repositories with metrics, sorted
+        """
+        with self.__lock:
+            known = [row[0] for row in self.__db.execute("SELECT DISTINCT repo FROM metrics ORDER BY repo")]
+        wanted = {repo.lower() for repo in repos} if repos is not None else None
+        return [repo for repo in known if fnmatch.fnmatch(repo.lower(), match.lower()) and (wanted is None or repo.lower() in wanted)]
+
+    def latest(self, repos: list) -> list:
+        """
+        Args:
+            repos ([]str): The repositories
+        Returns:
+            []dict: The last metrics of each repository - with 'community_files' as {path: bool}
+        """
+        latest = []
+        with self.__lock:
+            for repo in repos:
+                row = self.__db.execute("SELECT * FROM metrics WHERE repo = ? ORDER BY recorded_at DESC LIMIT 1", (repo,)).fetchone()
+                if row is None:
+                    continue
+                metrics = dict(zip(['repo', 'recorded_at'] + MetricsStore.counts + ['pushed_at'], row))
+                metrics['community_files'] = {path: bool(present) for path, present in self.__db.execute(
+                    "SELECT path, present FROM community_files WHERE repo = ? AND recorded_at = ?", (repo, metrics['recorded_at']))}
+                latest.append(metrics)
+        return latest
+
+    def missing(self, repos: list, path: str) -> list:
+        """
+        Returns:
+            []str: The repositories whose last run found no file at `path`, e.g. "LICENSE"
+        """
+        return [metrics['repo'] for metrics in self.latest(repos) if not metrics['community_files'].get(path, False)]
+
+    def weekly_activity(self, repos: list, weeks: int = 12, now: float = None):
+        """
+        The commits per week of the last `weeks` weeks. From the whole history where a mirror or clone
+        was read - otherwise from how the commit count grew between the runs.
+        Args:
+            repos ([]str): The repositories
+            weeks (int): The number of weeks, including the current one. Default: 12
+            now (float): The time the last week includes. Default: now
+        Returns:
+            []str, dict: The weeks, oldest first, and the commits per week (None where unknown) by repository
+        """
+        now = time.time() if now is None else now
+        labels = sorted({MetricsStore.week(now - days * 24 * 3600) for days in range(0, weeks * 7)})[-weeks:]
+        activity = {}
+        with self.__lock:
+            for repo in repos:
+                known = dict(self.__db.execute("SELECT week, commits FROM activity WHERE repo = ?", (repo,)))
+                if known:
+                    activity[repo] = [known.get(label, 0) for label in labels]
+                    continue
+                # The last count of each week - the commits of a week are the growth since the week before
+                last = {}
+                for recorded_at, commits in self.__db.execute(
+                        "SELECT recorded_at, commits FROM metrics WHERE repo = ? ORDER BY recorded_at", (repo,)):
+                    last[MetricsStore.week(recorded_at)] = commits
+                ordered = sorted(last)
+                growth = {week: last[week] - last[previous] for previous, week in zip(ordered, ordered[1:])
+                          if last[week] is not None and last[previous] is not None}
+                activity[repo] = [growth.get(label) for label in labels]
+        return labels, activity
+
+    def aggregate(self, repos: list, view: str = 'summary', path: str = 'LICENSE', weeks: int = 12) -> dict:
+        """
+        Args:
+            repos ([]str): The repositories
+            view (str): One of MetricsStore.views. Default: "summary"
+            path (str): Used with view "missing": The community file looked for. Default: "LICENSE"
+            weeks (int): Used with view "activity": The number of weeks. Default: 12
+        Returns:
+            dict: 'view' and what it shows - see to_markdown()
+        """
+        if view == 'summary':
+            latest = self.latest(repos)
+            return {'view': view, 'repos': latest,
+                    'missing': {path: [metrics['repo'] for metrics in latest if not metrics['community_files'].get(path, False)]
+                                for path in sorted({path for metrics in latest for path in metrics['community_files']})}}
+        if view == 'missing':
+            return {'view': view, 'path': path, 'repos': self.missing(repos, path)}
+        if view == 'activity':
+            labels, activity = self.weekly_activity(repos, weeks)
+            return {'view': view, 'weeks': labels, 'repos': activity}
+        raise ValueError(f"Unknown view: {view}")
+
+    @staticmethod
+    def to_markdown(aggregate: dict) -> str:
+        """
+        Args:
+            aggregate (dict): What aggregate() returns
+        Returns:
+            str: The view as Markdown
+        """
+        lines = []
+        if aggregate['view'] == 'summary':
+            lines += ["## Repositories", "",
+                      "| Repository | Open issues | Closed issues | Open PRs | Closed PRs | Contributors | Commits | Last push | Recorded |",
+                      "| --- | --- | --- | --- | --- | --- | --- | --- | --- |"]
+            for metrics in aggregate['repos']:
+                recorded = time.strftime('%Y-%m-%d %H:%M', time.gmtime(metrics['recorded_at']))
+                counts = ' | '.join('' if metrics[count] is None else str(metrics[count]) for count in MetricsStore.counts)
+                lines.append(f"| {metrics['repo']} | {counts} | {metrics['pushed_at'] or ''} | {recorded} |")
+            lines += ["", "## Missing community files", ""]
+            for path, repos in aggregate['missing'].items():
+                lines.append(f"- {path}: {len(repos)} - {', '.join(repos)}" if repos else f"- {path}: none")
+        elif aggregate['view'] == 'missing':
+            lines += [f"## Repositories without {aggregate['path']} ({len(aggregate['repos'])})", ""]
+            lines += [f"- {repo}" for repo in aggregate['repos']]
+        elif aggregate['view'] == 'activity':
+            lines += ["## Commits per week", "",
+                      f"| Repository | {' | '.join(aggregate['weeks'])} | Total |",
+                      f"| --- | {' | '.join('---' for _ in aggregate['weeks'])} | --- |"]
+            totals = [0] * len(aggregate['weeks'])
+            for repo, commits in aggregate['repos'].items():
+                totals = [total + (count or 0) for total, count in zip(totals, commits)]
+                lines.append(f"| {repo} | {' | '.join('' if count is None else str(count) for count in commits)} | {sum(count or 0 for count in commits)} |")
+            lines.append(f"| **All** | {' | '.join(str(total) for total in totals)} | {sum(totals)} |")
+        return '\n'.join(lines) + '\n'
+
+    def close(self):
+        with self.__lock:
+            self.__db.close()
@@ -0,0 +1,97 @@
+import os
+import base64
+import logging
+import subprocess
+
+from .localcheckout import LocalCheckout
+from .transport import HttpTransport
+
+logger = logging.getLogger(__name__)
+
+
+class RepoMirror(LocalCheckout):
+    """
+    A bare clone of a repository's branches kept in the cache directory, and brought up to date
+    with `git fetch` before each report. It's read like a local checkout - the whole history is
+    there, so the numbers don't depend on what GitHub's API pages or caps.
+    """
+    def __init__(self, directory: str, org_name: str, repo_name: str, url: str = None):
+        """
+        Args:
+            directory (str): Where the mirrors are kept
+            org_name (str): The organization (or user) owning the repository
+            repo_name (str): The name of the repository
+            url (str): Where the repository is cloned from. Default: the repository on github.com
+        """
+        self.path = RepoMirror.path_in(directory, org_name, repo_name, '.git')
+        self.root = self.path
+        self.worktree = False
+        self.shallow = False
+        self.logins = {}
+        self.url = url or f"https://github.com/{org_name}/{repo_name}.git"
+        self.history_file = RepoMirror.history_path(directory, org_name, repo_name)
+
+    @staticmethod
+    def history_path(directory: str, org_name: str, repo_name: str):
+        """
+        Returns:
+            str: Where the history of a repository is cached in the mirror directory
+        """
+        return RepoMirror.path_in(directory, org_name, repo_name, '.history.json')
+
+    @staticmethod
+    def path_in(directory: str, org_name: str, repo_name: str, suffix: str):
+        """
+        Returns:
+            str: "{directory}/{org_name}/{repo_name}{suffix}". Raises ValueError if the names would lead anywhere else,
+                e.g. "../.." - they come from the command line or a request to the report server
+        """
+        path = os.path.join(directory, org_name, f"{repo_name}{suffix}")
+        if os.path.dirname(os.path.dirname(os.path.abspath(path))) != os.path.abspath(directory):
+            raise ValueError(f"{org_name}/{repo_name} isn't the name of a repository")
+        return path
+
+    @staticmethod
+    def open(directory: str, org_name: str, repo_name: str):
+        """
+        Get the mirror of a repository up to date - cloning it the first time
+        Returns:
+            RepoMirror: The mirror - None if it couldn't be cloned or fetched
+        """
+        try:
+            mirror = RepoMirror(directory, org_name, repo_name)
+            mirror.update()
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            logger.warning(f"{org_name}/{repo_name}: no mirror - {getattr(e, 'stderr', None) or e}")
+            return None
+        return mirror
+
+    def __run(self, *args):
+        # The token goes to git in the environment - not on the command line, where other users could see it
+        env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+        token = HttpTransport.find_token() if self.url.startswith('https://github.com/') else None
+        if token is not None:
+            credentials = base64.b64encode(f"x-access-token:{token}".encode('utf-8')).decode('ascii')
+            env.update({'GIT_CONFIG_COUNT': '1', 'GIT_CONFIG_KEY_0': 'http.https://github.com/.extraheader',
+                        'GIT_CONFIG_VALUE_0': f"AUTHORIZATION: basic {credentials}"})
+        return subprocess.run(['git'] + list(args), env=env, capture_output=True, text=True, check=True).stdout
+
+    def update(self):
+        """
+        Clone the repository, or fetch what changed since the last time
+        """
+        if not os.path.isdir(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.__run('clone', '--bare', '--quiet', self.url, self.path)
+            # Only the branches - a plain --mirror would fetch every pull request's refs as well
+            self.git('config', 'remote.origin.fetch', '+refs/heads/*:refs/heads/*')
+            return
+        self.__run('-C', self.path, 'fetch', '--prune', '--quiet', 'origin')
+        if subprocess.run(['git', '-C', self.path, 'rev-parse', '--verify', '--quiet', 'HEAD'], capture_output=True).returncode != 0:
+            # The default branch was renamed - point HEAD to the new one
+            head = self.__run('-C', self.path, 'ls-remote', '--symref', 'origin', 'HEAD').split('\n')[0]
+            if head.startswith('ref: '):
+                self.git('symbolic-ref', 'HEAD', head[5:].split('\t')[0])
+
+    def history(self, cache_file: str = None) -> dict:
+        return super().history(cache_file or self.history_file)
@@ -0,0 +1,93 @@
+import sys
+
+
+class Record:
+    """
+    A compact, read-only stand-in for a JSON object from GitHub's API - only the fields the reports
+    use are kept, in `__slots__`. It can still be read like the dict it came from: record['title'],
+    'pull_request' in record and record.get('state'). A field that is None counts as missing.
+    """
+    __slots__ = ()
+    # The fields kept - the subclasses' __slots__
+    fields = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.fields, values):
+            object.__setattr__(self, field, value)
+
+    @classmethod
+    def from_json(cls, element: dict):
+        """
+        Args:
+            element (dict): A JSON object as GitHub's API returns it
+        Returns:
+            Record: The fields of the object that are kept
+        """
+        return cls(*map(element.get, cls.fields))
+
+    @classmethod
+    def project(cls, elements: list) -> list:
+        """
+        Args:
+            elements ([]dict): A page of JSON objects
+        Returns:
+            []Record: The records of the objects - the objects themselves can be let go
+        """
+        return [cls.from_json(element) for element in elements]
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key):
+        if key not in self.fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.fields and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.fields else None
+        return default if value is None else value
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            dict: The fields that aren't None
+        """
+        return {field: getattr(self, field) for field in self.fields if getattr(self, field) is not None}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, field) == getattr(other, field) for field in self.fields)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{field}={getattr(self, field)!r}' for field in self.fields)})"
+
+
+class IssueRecord(Record):
+    """
+    An issue - or a PR, GitHub's issues API returns both. `pull_request` is True for PRs
+    """
+    __slots__ = fields = ('number', 'title', 'state', 'updated_at', 'pull_request')
+
+    @classmethod
+    def from_json(cls, element: dict):
+        # The few states are shared instead of one string per issue
+        state = sys.intern(element['state']) if element.get('state') else None
+        return cls(element.get('number'), element.get('title'), state, element.get('updated_at'),
+                   True if element.get('pull_request') else None)
+
+
+class ContributorRecord(Record):
+    """
+    A contributor. `name` is only set for authors of a local clone that aren't linked to a login
+    """
+    __slots__ = fields = ('login', 'html_url', 'contributions', 'name')
+
+
+class RepositoryRecord(Record):
+    __slots__ = fields = ('name', 'full_name')
+
+
+class CollaboratorRecord(Record):
+    __slots__ = fields = ('login', 'html_url', 'role_name')
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import glob
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .transport import Transport, Response, Headers
+
+
+def fixture_key(method: str, path: str, body: str = None):
+    """
+    Args:
+        method (str): The HTTP method
+        path (str): The API path
+        body (str): The request body. Default: None
+    Returns:
+        str: The name a recorded response is kept under
+    """
+    return hashlib.sha1(f"{method} {path}\n{body or ''}".encode('utf-8')).hexdigest()[:20]
+
+
+class RecordingTransport(Transport):
+    """
+    Passes requests on to another transport and saves each response - status, headers and body -
+    as a JSON fixture file that ReplayTransport can serve later.
+    """
+    def __init__(self, transport: Transport, directory: str):
+        """
+        Args:
+            transport (Transport): The transport that sends the requests
+            directory (str): Where the fixtures are saved
+        """
+        self.transport = transport
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def request(self, method: str, path: str, body: str = None, headers: dict = None) -> Response:
+        response = self.transport.request(method, path, body, headers)
+        fixture = {
+            'method': method, 'path': path, 'body': body,
+            'status': response.status, 'reason': response.reason,
+            'headers': dict(response.headers), 'response': response.body}
+        with open(os.path.join(self.directory, f"{fixture_key(method, path, body)}.json"), 'w') as f:
+            json.dump(fixture, f, indent=1)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Serves recorded responses instead of asking GitHub - with a simulated latency and rate limit.
+    Requests without a fixture go to the `fallback` transport if there is one, otherwise they get a 404.
+    """
+    def __init__(self, directory: str = None, fallback: Transport = None, latency: float = 0, rate_limit: int = 5000):
+        """
+        Args:
+            directory (str): Where the fixtures are. Default: None
+            fallback (Transport): Answers requests there is no fixture for, e.g. a synthetic GitHub. Default: None
+            latency (float): Seconds each request takes. Default: 0
+            rate_limit (int): The requests per hour reported in the X-RateLimit-* headers. Default: 5000
+        """
+        self.fixtures = {}
+        self.fallback = fallback
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.requests = []
+        self.__lock = threading.Lock()
+        self.__reset = int(time.time()) + 3600
+        for name in glob.glob(os.path.join(directory, '*.json')) if directory else []:
+            with open(name) as f:
+                fixture = json.load(f)
+            self.fixtures[fixture_key(fixture['method'], fixture['path'], fixture['body'])] = fixture
+
+    def request(self, method: str, path: str, body: str = None, headers: dict = None) -> Response:
+        if self.latency:
+            time.sleep(self.latency)
+        with self.__lock:
+            self.requests.append((method, path))
+            remaining = max(0, self.rate_limit - len(self.requests))
+        fixture = self.fixtures.get(fixture_key(method, path, body))
+        if fixture is not None:
+            response = Response(fixture['status'], fixture['reason'], Headers(fixture['headers']), fixture['response'])
+        elif self.fallback is not None:
+            response = self.fallback.request(method, path, body, headers)
+        else:
+            response = Response(404, 'Not Found', Headers(), json.dumps({'message': f"No fixture for {method} {path}"}))
+        response.headers.update({
+            'X-RateLimit-Limit': str(self.rate_limit),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset': str(self.__reset)})
+        return response
+
+
+class ReplayServer:
+    """
+    A local HTTP server answering with a transport - e.g. a ReplayTransport - so HttpTransport
+    can be run against recorded responses:
+
+        with ReplayServer(ReplayTransport('fixtures')) as server:
+            Ghutils.set_transport(HttpTransport(token='replay', base_url=server.url))
+    """
+    def __init__(self, transport: Transport, host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            transport (Transport): What answers the requests
+            host (str): The address to listen on. Default: 127.0.0.1
+            port (int): The port to listen on. Default: any free port
+        """
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def answer(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length).decode('utf-8') if length else None
+                response = transport.request(self.command, self.path.lstrip('/'), body, dict(self.headers))
+                payload = (response.body or '').encode('utf-8')
+                self.send_response(response.status, response.reason)
+                for name, value in response.headers.items():
+                    if name.lower() not in ('content-length', 'transfer-encoding', 'connection', 'content-encoding'):
+                        self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = answer
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self.__thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
@@ -2,42 +2,152 @@ import subprocess
 import json
 import sys
 import re
-import base64
 import os
 import time
+import logging
+import tempfile
+import shutil
+import threading
+import contextlib
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 
-# Add directory of this class to the general class_path
-# to allow import of sibling classes
-class_path = os.path.dirname(os.path.abspath(__file__))
-sys.path.append(class_path)
+from .ghutils import Ghutils
+from .scheduler import RequestScheduler
+from .snapshot import RepoSnapshot
+from .batch import RepoBatch
+from .stats import Stats
+from .localcheckout import LocalCheckout
+from .mirror import RepoMirror
+from .records import IssueRecord, ContributorRecord
+from .codeowners import CodeOwners
 
-from ghutils import Ghutils
+logger = logging.getLogger(__name__)
 
 class Repo:
     """
     A class to represent a GitHub repository.
     """    
-    def __init__(self, org_name, repo_name):
+    # The files checked in the community standards section
+    community_files = ['CODEOWNERS', 'README.md', 'CONTRIBUTING.md', 'CONTRIBUTE.md', 'LICENSE', '.gitignore']
+    # Where the snapshots are kept in incremental mode - None when it's off
+    snapshot_dir = None
+    # Where the bare mirrors are kept for the commit analytics - None when it's off
+    mirror_dir = None
+    # Where the numbers of the report issues are remembered - None to search for them every time
+    issue_index = None
+    # Where the metrics of each report are appended for `reporeport aggregate` - None to keep no history
+    metrics_store = None
+
+    @Stats.section
+    def __init__(self, org_name, repo_name, snapshot: RepoSnapshot = None, prefetched: dict = None, local: LocalCheckout = None):
+        """
+        Args:
+            org_name (str): The organization (or user) owning the repository
+            repo_name (str): The name of the repository
+            snapshot (RepoSnapshot): The snapshot from the last run in incremental mode. Default: None
+            prefetched (dict): What RepoBatch already fetched for this repository. Default: None
+            local (LocalCheckout): A clone of the repository - the community files and contributors are read from it,
+                only the files if it's shallow. Default: None
+        """
         self.org_name = org_name
         self.repo_name = repo_name
+        self.snapshot = snapshot
+        self.history = None
+        self.local_logins = {}
+        if Repo.mirror_dir is not None:
+            # The whole history is read from a mirror - or from the clone we are in
+            if local is None:
+                local = RepoMirror.open(Repo.mirror_dir, org_name, repo_name)
+            if local is not None and local.shallow:
+                logger.warning(f"{org_name}/{repo_name}: no history - the clone is shallow")
+            elif local is not None:
+                try:
+                    self.history = local.history(RepoMirror.history_path(Repo.mirror_dir, org_name, repo_name))
+                except (OSError, ValueError, subprocess.CalledProcessError) as e:
+                    logger.warning(f"{org_name}/{repo_name}: no history - {e}")
         
-        print(Ghutils.get_pull_request_counts(self.org_name, self.repo_name))
-        
-        
-        _,self.repo, responseheader = Ghutils.query_github_incl_header(f'repos/{self.org_name}/{self.repo_name}')
-        print(responseheader)
-        _,self.contributors = Ghutils.query_github(f'repos/{self.org_name}/{self.repo_name}/contributors')
-    
-        _,self.issues = Ghutils.query_github_allpages(f"repos/{self.org_name}/{self.repo_name}/issues?state=all")
-        _,self.prs = Ghutils.query_github_allpages(f'repos/{self.org_name}/{self.repo_name}/pulls?state=all')
-        _,self.commits = Ghutils.query_github(f'repos/{self.org_name}/{self.repo_name}/commits')
+        if prefetched is not None:
+            self.repo = prefetched['repo']
+        else:
+            _,self.repo, responseheader = Ghutils.query_github_incl_header(f'repos/{self.org_name}/{self.repo_name}')
+            logger.debug(responseheader)
+        if local is not None and not local.shallow:
+            # The commits are only fetched if some authors can't be linked to their login without them
+            self.commits = None
+            def commits():
+                _,self.commits = Ghutils.query_github(f'repos/{self.org_name}/{self.repo_name}/commits?per_page=100', False)
+                return self.commits if isinstance(self.commits, list) else []
+            self.contributors = ContributorRecord.project(local.contributors(commits))
+            self.local_logins = local.logins
+        elif snapshot is not None and snapshot.get('contributors') is not None and snapshot.get('pushed_at') == self.repo.get('pushed_at'):
+            # Nothing was pushed since the snapshot - so the commits and contributors are the same
+            self.contributors = ContributorRecord.project(snapshot.get('contributors'))
+            self.commits = snapshot.get('commits')
+        else:
+            # All pages - the first one alone has only 30 of them, and the counts end up in the metrics store
+            _,self.contributors = Ghutils.query_github_allpages(f'repos/{self.org_name}/{self.repo_name}/contributors', record=ContributorRecord)
+            if prefetched is not None:
+                self.commits = prefetched['commits']
+            else:
+                _,self.commits = Ghutils.query_github(f'repos/{self.org_name}/{self.repo_name}/commits')
+            if snapshot is not None:
+                snapshot.set('pushed_at', self.repo.get('pushed_at'))
+                snapshot.set('contributors', [contributor.to_dict() for contributor in self.contributors])
+                snapshot.set('commits', self.commits)
         
-        self.open_issues_count = self.repo['open_issues_count']
-        self.closed_prs_count = Ghutils.get_element_count(self.prs, 'state', 'closed')
-        self.open_prs_count = Ghutils.get_element_count(self.prs, 'state', 'open')
-        self.closed_issues_count = Ghutils.get_element_count(self.issues, 'state', 'closed')
+        # Only the counts are needed for the summary - the issues and PRs themselves are fetched if they are used
+        counts = prefetched['counts'] if prefetched is not None else Ghutils.get_issue_pr_counts(self.org_name, self.repo_name)
+        self.open_issues_count = counts['open_issues']
+        self.closed_issues_count = counts['closed_issues']
+        self.open_prs_count = counts['open_prs']
+        self.closed_prs_count = counts['closed_prs']
+        self.__issues = None
         self.issue_title_template = self.org_name+"/"+self.repo_name+" - Report"        
+        if local is not None:
+            self.files = local.files(Repo.community_files)
+        else:
+            self.files = prefetched['files'] if prefetched is not None else None
+        self.local = local
         
+    @property
+    def issues(self):
+        """
+        All issues (and PRs - GitHub's issues API includes them) - fetched on first use, as IssueRecords
+        """
+        if self.__issues is None:
+            api = f"repos/{self.org_name}/{self.repo_name}/issues?state=all"
+            if self.snapshot is None:
+                _,self.__issues = Ghutils.query_github_allpages(api, record=IssueRecord)
+            else:
+                # Only the issues updated since the snapshot are fetched and merged into it
+                since = self.snapshot.get('issues_since')
+                fetched_at = RepoSnapshot.now()
+                _,issues = Ghutils.query_github_allpages(api if since is None else f"{api}&since={since}", record=IssueRecord)
+                self.__issues = IssueRecord.project(self.snapshot.merge_issues(issues))
+                self.snapshot.set('issues_since', fetched_at)
+        return self.__issues
+
+    def metrics(self) -> dict:
+        """
+        The numbers of the report - for tools rather than people
+        Returns:
+            dict: The counts of issues and PRs, contributors and their commits, which community files exist and when the repository was last pushed to
+        """
+        metrics = {
+            'open_issues': self.open_issues_count,
+            'closed_issues': self.closed_issues_count,
+            'open_prs': self.open_prs_count,
+            'closed_prs': self.closed_prs_count,
+            'contributors': len(self.contributors),
+            'commits': sum(contributor['contributions'] or 0 for contributor in self.contributors),
+            'community_files': {path: self.community_file(path) is not None for path in Repo.community_files},
+            'pushed_at': self.repo.get('pushed_at')}
+        if self.history is not None:
+            metrics['commits_per_month'] = dict(sorted(self.history['months'].items()))
+            metrics['commits_per_week'] = dict(sorted(self.history['weeks'].items()))
+        return metrics
+
     def get_issue_by_title(self,regex):
         json_obj = Ghutils.get_element_by_regex(self.issues,'title',regex)
         if json_obj is not None:
@@ -46,49 +156,270 @@ class Repo:
             return None
 
     @staticmethod
-    def full_report(org_name, repo_name, target: str = 'stdout'):
-        my_ghrepo = Repo(org_name, repo_name)
+    def build_report(org_name, repo_name, sink=None, prefetched: dict = None, local: LocalCheckout = None):
+        """
+        Build the full report of a repository as the current thread's report.
+        Args:
+            org_name (str): The organization (or user) owning the repository
+            repo_name (str): The name of the repository
+            sink (file): Where the report is streamed to. Default: a spooled temporary file - see Ghutils.take_report()
+            prefetched (dict): What RepoBatch already fetched for the repository. Default: None
+            local (LocalCheckout): A clone of the repository to read the community files and contributors from. Default: None
+        Returns:
+            Repo: The repository the report was built from
+        """
+        Ghutils.open_report(sink)
+        snapshot = RepoSnapshot(Repo.snapshot_dir, org_name, repo_name) if Repo.snapshot_dir is not None else None
+        my_ghrepo = Repo(org_name, repo_name, snapshot, prefetched, local)
         my_ghrepo.md_repo()
         my_ghrepo.md_contributors()
+        my_ghrepo.md_activity()
         my_ghrepo.md_community_standards()
         Ghutils.merge_buffers()
+        if snapshot is not None:
+            snapshot.save()
+        if Repo.metrics_store is not None:
+            Repo.metrics_store.record(f"{org_name}/{repo_name}", my_ghrepo.metrics())
+        return my_ghrepo
+
+    @staticmethod
+    def full_report(org_name, repo_name, target: str = 'stdout', local: LocalCheckout = None):
         if target == 'stdout':
-            Ghutils.buffer_to_stdout()
+            Repo.build_report(org_name, repo_name, sys.stdout, local=local)
+            Ghutils.take_report().close()
+            print()
         elif target == 'issue':
+            my_ghrepo = Repo.build_report(org_name, repo_name, local=local)
             my_ghrepo.update_issue()
+        elif Repo.snapshot_dir is None:
+            with Repo.replace_file(target) as f:
+                Repo.build_report(org_name, repo_name, f, local=local)
+                Ghutils.take_report().close()
+        else:
+            Repo.build_report(org_name, repo_name, local=local)
+            Repo.write_report_file(target, [Ghutils.take_report()])
+
+    @staticmethod
+    def full_reports(repos, target: str = 'stdout', jobs: int = 1, batch: bool = True):
+        """
+        Build the full reports of several repositories - up to `jobs` at the same time.
+        The reports are output in the same order as `repos` no matter which one finishes first.
+        A repository that fails is reported on stderr - the rest of them are still built.
+        Args:
+            repos ([]str): The full names of the repositories in the form "org/repo"
+            target (str): "stdout", "issue" or the name of a file. A file gets all the reports, one after the other. Default: "stdout"
+            jobs (int): The maximum number of reports built concurrently. Default: 1
+            batch (bool): Fetch the repositories' metadata, counts, community files and recent commits for all of them
+                in a few GraphQL queries first. Default: True
+        Returns:
+            int: The number of repositories that failed
+        """
+        prefetched = RepoBatch(Repo.community_files).fetch(repos) if batch and len(repos) > 1 else {}
+
+        def build(full_name):
+            try:
+                org_name, repo_name = full_name.split('/', maxsplit=1)
+                # The report is spooled - in memory while it's small, on disk when it grows
+                my_ghrepo = Repo.build_report(org_name, repo_name, prefetched=prefetched.get(full_name))
+                return my_ghrepo, Ghutils.take_report()
+            except (Exception, SystemExit) as e:
+                Ghutils.reset_buffers()
+                return None, f"{type(e).__name__}: {e}"
+
+        failed = 0
+        started = time.time()
+
+        def reports():
+            nonlocal failed
+            with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+                for done, (full_name, (my_ghrepo, content)) in enumerate(zip(repos, executor.map(build, repos)), start=1):
+                    if my_ghrepo is None:
+                        failed += 1
+                        print(f"Error: {full_name} failed - {content}", file=sys.stderr)
+                    else:
+                        yield my_ghrepo, content
+                    if len(repos) > 1:
+                        print(f"[{done}/{len(repos)}] {full_name} - {Repo.projected_time_left(started, done, len(repos))}", file=sys.stderr)
+
+        if target == 'stdout':
+            for _, report in reports():
+                report.copy_to(sys.stdout)
+                print()
+                report.close()
+        elif target == 'issue':
+            for my_ghrepo, report in reports():
+                my_ghrepo.update_issue(report.read())
+                report.close()
         else:
-            Ghutils.buffer_to_file(target)
-            
-    def update_issue(self):
-        Ghutils.buffer_to_file('tmp_issue_body.md')
-        retval = 101
-        issue_number = self.get_issue_by_title("^"+self.issue_title_template+"$")
+            Repo.write_report_file(target, (report for _, report in reports()))
+        return failed
+
+    @staticmethod
+    def write_report_file(location: str, reports):
+        """
+        Write reports to a file. In incremental mode a file that would end up byte-identical is left untouched.
+        Args:
+            location (str): The file
+            reports ([]ReportWriter): The spooled reports - they are closed when written
+        Returns:
+            bool: True if the file was written
+        """
+        if Repo.snapshot_dir is None:
+            with Repo.replace_file(location) as f:
+                for report in reports:
+                    report.copy_to(f)
+                    report.close()
+            return True
+
+        with tempfile.TemporaryFile('w+') as new:
+            for report in reports:
+                report.copy_to(new)
+                report.close()
+            if os.path.exists(location):
+                new.seek(0)
+                with open(location) as old:
+                    while True:
+                        new_chunk, old_chunk = new.read(65536), old.read(65536)
+                        if new_chunk != old_chunk:
+                            break
+                        if not new_chunk:
+                            print(f"{location} is up to date", file=sys.stderr)
+                            return False
+            new.seek(0)
+            with Repo.replace_file(location) as f:
+                shutil.copyfileobj(new, f)
+        return True
+
+    @staticmethod
+    @contextlib.contextmanager
+    def replace_file(location: str):
+        """
+        Write a file in place of another one - only once everything is written. A report that fails
+        half way (e.g. sys.exit() on an API error) leaves the last good one as it was
+        Args:
+            location (str): The file
+        Yields:
+            file: A temporary file next to it, opened for writing
+        """
+        temporary = f"{location}.{os.getpid()}.{threading.get_ident()}.tmp"
+        # Created like open() would - with the permissions the umask allows
+        f = os.fdopen(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), 'w')
         try:
-            if issue_number is not None:
-                print(f"Updating issue {issue_number}")
-                result = subprocess.run(['gh', 'issue', 'edit', "{issue_number}", '--body-file', 'tmp_issue_body.md'], capture_output=True, text=True)
-                if result.returncode == 0:                
-                  print(result.stdout)
-                  retval = 0
-                  
-                print(f"Making sure issue {issue_number} is open")
-                result = subprocess.run(['gh', 'issue', 'reopen', str(issue_number) ], capture_output=True, text=True)
-                print(result.stdout)
-                print(result.stderr)
-            else:
-                print(f"Creating issue '{self.issue_title_template}'")
-                result = subprocess.run(['gh', 'issue', 'create', '--title', self.issue_title_template, '--body-file', 'tmp_issue_body.md'], capture_output=True, text=True)
-                if result.returncode == 0:
-                  print (result.stdout)
-                  retval = 0
-                else:
-                  print (result.stderr) 
-                  retval = 1
-        finally:
-            subprocess.run(['rm', 'tmp_issue_body.md'])
-            return retval 
+            with f:
+                yield f
+            os.replace(temporary, location)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
 
-        
+    @staticmethod
+    def projected_time_left(started: float, done: int, total: int):
+        """
+        Estimate how long the rest of a batch takes - from the time per repository so far and,
+        if the requests are scheduled, the requests per repository and the rate limit.
+        Args:
+            started (float): When the batch started
+            done (int): The number of repositories done
+            total (int): The number of repositories in the batch
+        Returns:
+            str: The estimate, e.g. "about 4m10s left"
+        """
+        seconds = (time.time() - started) / done * (total - done)
+        scheduler = Ghutils.get_transport().find(RequestScheduler)
+        if scheduler is not None:
+            seconds = max(seconds, scheduler.projection(scheduler.requests_sent / done * (total - done)))
+        return f"about {int(seconds // 60)}m{int(seconds % 60):02d}s left"
+
+    def find_report_issue(self):
+        """
+        Find the report issue - without going through all the issues. The number remembered in
+        issue_index is checked first, otherwise the issue is searched for by its exact title.
+        Returns:
+            json: The issue - None if there is none
+        """
+        full_name = f"{self.org_name}/{self.repo_name}"
+        number = Repo.issue_index.get(full_name) if Repo.issue_index is not None else None
+        if number is not None:
+            returncode, issue = Ghutils.query_github(f"repos/{full_name}/issues/{number}", False)
+            # Deleted, transferred or renamed since - search again
+            if returncode == 0 and issue.get('title') == self.issue_title_template and 'pull_request' not in issue:
+                return issue
+            Repo.issue_index.set(full_name)
+
+        query = urllib.parse.quote(f'repo:{full_name} is:issue in:title "{self.issue_title_template}"')
+        returncode, found = Ghutils.query_github(f"search/issues?q={query}&sort=created&order=desc&per_page=100", False)
+        if returncode != 0:
+            # Without search look through all the issues
+            logger.warning(found)
+            issue = Ghutils.get_element_by_regex(self.issues, 'title', "^"+re.escape(self.issue_title_template)+"$")
+        else:
+            # The search matches words - only the exact title will do
+            issue = next((item for item in found['items'] if item['title'] == self.issue_title_template), None)
+        if issue is not None and Repo.issue_index is not None:
+            Repo.issue_index.set(full_name, issue['number'])
+        return issue
+
+    def update_issue(self, body: str = None):
+        """
+        Create or update the report issue on the repository - a constant number of requests, however many issues there are.
+        Args:
+            body (str): The body of the issue. Default: the content of the current thread's buffer
+        Returns:
+            int: 0 on success
+        """
+        if body is None:
+            body = Ghutils.buffer_to_string()
+        issue = self.find_report_issue()
+        if self.snapshot is not None and issue is not None and issue['state'] == 'open' and not self.snapshot.report_changed('issue', body):
+            print(f"Issue {issue['number']} is up to date")
+            return 0
+        if issue is not None:
+            # Updating and reopening is one request
+            print(f"Updating issue {issue['number']}")
+            response = Ghutils.request('PATCH', f"repos/{self.org_name}/{self.repo_name}/issues/{issue['number']}",
+                                       json.dumps({'body': body, 'state': 'open'}))
+        else:
+            print(f"Creating issue '{self.issue_title_template}'")
+            response = Ghutils.request('POST', f"repos/{self.org_name}/{self.repo_name}/issues",
+                                       json.dumps({'title': self.issue_title_template, 'body': body}))
+        if not response.ok:
+            print(f"Error: {response.error}", file=sys.stderr)
+            return 1
+        print(response.json()['html_url'])
+        if Repo.issue_index is not None:
+            Repo.issue_index.set(f"{self.org_name}/{self.repo_name}", response.json()['number'])
+        if self.snapshot is not None:
+            self.snapshot.remember_report('issue', body)
+            self.snapshot.save()
+        return 0
+
+    def community_file(self, path):
+        """
+        Get one of the community files. The first call fetches all of them in one go.
+        Args:
+            path (str): One of the paths in community_files
+        Returns:
+            RepoFile: The file - None if it doesn't exist
+        """
+        if self.files is None:
+            self.files = Ghutils.get_files(self.org_name, self.repo_name, Repo.community_files)
+        return self.files[path]
+
+    def tree(self):
+        """
+        The paths of all files in the repository - from the clone or mirror if there is one, otherwise in one API request
+        Returns:
+            []str, bool: The paths, and whether the list is cut short - None, None if they couldn't be listed
+        """
+        if self.local is not None:
+            try:
+                return self.local.tree(), False
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.warning(f"{self.org_name}/{self.repo_name}: no tree from the clone - {e}")
+        return Ghutils.get_tree(self.org_name, self.repo_name)
+
+    @Stats.section
     def md_community_standards(self):
         Ghutils.print_to_buffer(f"### Community standards\n")
         self.md_get_codeowners()
@@ -98,51 +429,51 @@ class Repo:
         self.md_get_gitginore()
         
     def md_get_license(self):
-        status,license_file = Ghutils.query_github(f'repos/{self.org_name}/{self.repo_name}/contents/LICENSE',False)     
-        if status != 0:
+        license_file = self.community_file('LICENSE')
+        if license_file is None:
             Ghutils.print_to_buffer(f"- [ ] `LICENSE` file [(Set it up!)]({Ghutils.about_license_url})")
         else:
             Ghutils.print_to_buffer(f"- [x] `LICENSE` file")
-            Ghutils.details_summary_to_buffer("See content of <code>LICENSE</code>","```\n"+base64.b64decode(license_file['content']).decode('utf-8')+"\n```")
+            Ghutils.details_summary_to_buffer("See content of <code>LICENSE</code>","```\n"+license_file.content+"\n```")
     
     def md_get_gitginore(self):
-        status,gitignore_file = Ghutils.query_github(f'repos/{self.org_name}/{self.repo_name}/contents/.gitignore',False)     
-        if status != 0:
+        gitignore_file = self.community_file('.gitignore')
+        if gitignore_file is None:
             Ghutils.print_to_buffer(f"- [ ] `.gitignore` file [(Set it up!)]({Ghutils.gitginore_templates_url})")
         else:
             Ghutils.print_to_buffer(f"- [x] `.gitignore` file")
-            Ghutils.details_summary_to_buffer("See content of <code>.gitignore</code>","```gitginore\n"+base64.b64decode(gitignore_file['content']).decode('utf-8')+"\n```")
+            Ghutils.details_summary_to_buffer("See content of <code>.gitignore</code>","```gitginore\n"+gitignore_file.content+"\n```")
     
     def md_get_readme(self):
-        status,readme_file = Ghutils.query_github(f'repos/{self.org_name}/{self.repo_name}/contents/README.md',False)     
-        if status != 0:
+        readme_file = self.community_file('README.md')
+        if readme_file is None:
             Ghutils.print_to_buffer(f"- [ ] `README.md` file [(Set it up!)]({Ghutils.about_readme_url})")
         else:
             Ghutils.print_to_buffer(f"- [x] `README.md` file")
-            Ghutils.details_summary_to_buffer("See content of <code>README.md</code>",base64.b64decode(readme_file['content']).decode('utf-8'))
+            Ghutils.details_summary_to_buffer("See content of <code>README.md</code>",readme_file.content)
     
     def md_get_contributing(self):
-        status,contributing_file = Ghutils.query_github(f'repos/{self.org_name}/{self.repo_name}/contents/CONTRIBUTING.md',False)     
-        if status != 0:
+        contributing_file = self.community_file('CONTRIBUTING.md')
+        if contributing_file is None:
             # Special case: CONTRIBUTING.md file is not found, but CONTRIBUTE.md is found
-            status,contributing_file = Ghutils.query_github(f'repos/{self.org_name}/{self.repo_name}/contents/CONTRIBUTE.md',False)     
-            if status != 0: 
+            contributing_file = self.community_file('CONTRIBUTE.md')
+            if contributing_file is None: 
                 Ghutils.print_to_buffer(f"- [ ] `CONTRIBUTING.md` file")
             else:
                 Ghutils.print_to_buffer(f"- [x] `CONTRIBUTE.md` file - **Note:** [Consider renaming it to `CONTRIBUTING.md`]({Ghutils.about_contributing_url})")
-                Ghutils.details_summary_to_buffer("See content of <code>CONTRIBUTE.md</code>",base64.b64decode(contributing_file['content']).decode('utf-8'))
+                Ghutils.details_summary_to_buffer("See content of <code>CONTRIBUTE.md</code>",contributing_file.content)
         else:
             Ghutils.print_to_buffer(f"- [x] `CONTRIBUTING.md` file")
-            Ghutils.details_summary_to_buffer("See content of <code>CONTRIBUTING.md</code>",base64.b64decode(contributing_file['content']).decode('utf-8'))
+            Ghutils.details_summary_to_buffer("See content of <code>CONTRIBUTING.md</code>",contributing_file.content)
     
     def md_get_codeowners(self):
-        # Retrieve the CODEOWNERS file content and decode it from base64
-           status,codeowners_file = Ghutils.query_github(f'repos/{self.org_name}/{self.repo_name}/contents/CODEOWNERS',False)  
-           if status != 0:
+        # Retrieve the CODEOWNERS file content
+           codeowners_file = self.community_file('CODEOWNERS')
+           if codeowners_file is None:
                Ghutils.print_to_buffer(f"- [ ] `CODEOWNERS` file [(Set it up!)]({Ghutils.about_codeowners_url})")
            else:
                Ghutils.print_to_buffer(f"- [x] `CODEOWNERS` file")
-               codeowners = base64.b64decode(codeowners_file['content']).decode('utf-8')
+               codeowners = codeowners_file.content
                # Regular expression pattern to match mentions of @user or @team
                owner_pattern = r"@([\w\-\/]+)"
                # Loop through each line in the codeowners file, extract the owners and print them
@@ -158,10 +489,45 @@ class Repo:
                    if line_owners:
                        owners.extend(line_owners)
                unique_owners ='' 
-               for owner in list(set(owners)):
+               # Keep the order of appearance, so an unchanged file gives an unchanged report
+               for owner in dict.fromkeys(owners):
                    unique_owners += f" - @{owner}\n"
                Ghutils.details_summary_to_buffer("See list of mentioned CODEOWNERS",unique_owners) 
+               self.md_codeowners_coverage(CodeOwners(codeowners))
+
+    def md_codeowners_coverage(self, codeowners: CodeOwners, shown: int = 100):
+        """
+        Output which files the CODEOWNERS rules give owners to - the files without, the rules deciding no file and the files of each owner
+        Args:
+            codeowners (CodeOwners): The compiled CODEOWNERS file
+            shown (int): The most paths listed. Default: 100
+        """
+        paths, truncated = self.tree()
+        if paths is None:
+            return
+        coverage = codeowners.coverage(paths)
+        owned = coverage['files'] - len(coverage['unowned'])
+        percent = f" ({owned * 100 // coverage['files']}%)" if coverage['files'] else ''
+        Ghutils.print_to_buffer(f"  - {owned} of {coverage['files']} files have code owners{percent}"
+                                + (" - **Note:** GitHub listed only part of the files" if truncated else ''))
+        if coverage['unowned']:
+            unowned = "".join(f" - `{path}`\n" for path in coverage['unowned'][:shown])
+            if len(coverage['unowned']) > shown:
+                unowned += f" - ... and {len(coverage['unowned']) - shown} more\n"
+            Ghutils.details_summary_to_buffer(f"See the {len(coverage['unowned'])} files without code owners", unowned)
+        if coverage['dead_rules']:
+            Ghutils.print_to_buffer(f"  - {len(coverage['dead_rules'])} rules decide the owners of no file")
+            Ghutils.details_summary_to_buffer("See the rules deciding no file",
+                                              "".join(f" - Line {rule.line}: `{rule.pattern}`\n" for rule in coverage['dead_rules']))
+        if coverage['errors']:
+            Ghutils.print_to_buffer(f"  - {len(coverage['errors'])} lines are invalid and ignored by GitHub")
+            Ghutils.details_summary_to_buffer("See the invalid lines",
+                                              "".join(f" - Line {number}: `{line}` - {error}\n" for number, line, error in coverage['errors']))
+        if coverage['owners']:
+            Ghutils.details_summary_to_buffer("See the number of files of each code owner",
+                                              "| Code owner | Files |\n| --- | --- |\n" + "".join(f"| {owner} | {files} |\n" for owner, files in coverage['owners'].items()))
  
+    @Stats.section
     def md_repo(self):
         """Output in MarkDown the details of the repository.
 
@@ -190,6 +556,7 @@ pie showData title Issues and PRs
         Ghutils.print_to_buffer(
             template.format(self.open_issues_count, self.closed_issues_count, self.open_prs_count, self.closed_prs_count))
                   
+    @Stats.section
     def md_contributors(self):
         """
         Qutput in MarkDown the list of contributors to the repository.
@@ -202,8 +569,14 @@ pie showData title Issues and PRs
 ```mermaid
 pie showData title Contributors (number of commits)
 '''
+        users = Ghutils.get_users([contributor['login'] for contributor in self.contributors if contributor['login'] is not None])
         for contributor in self.contributors:
-            _,user = Ghutils.query_github(f"users/{contributor['login']}")
+            if contributor['login'] is None:
+                # An author of the local checkout whose commits aren't linked to a GitHub account
+                Ghutils.print_to_buffer(f"- [ ] _{contributor['name']}_ - commits not linked to a GitHub account ({contributor['contributions']})")
+                mermaid += f'"{contributor["name"]}" : {contributor["contributions"]}\n'
+                continue
+            user = users[contributor['login']]
             bullet = '- [ ]'
             name = f'_Name is not set - [fix it!]({Ghutils.change_ghname_url})_ '
             if user['name'] is not None:
@@ -215,3 +588,36 @@ pie showData title Contributors (number of commits)
         Ghutils.print_to_buffer(       mermaid + "\n```\n")
     
 
+    @Stats.section
+    def md_activity(self):
+        """
+        Output in MarkDown the commits per month and the lines changed per contributor - only when the history was read from a mirror or clone.
+
+        Returns:
+            None
+        """
+        if self.history is None:
+            return
+        Ghutils.print_to_buffer(f"### Activity\n")
+        # The last 12 months, including the current one
+        year, month = map(int, time.strftime('%Y-%m', time.gmtime()).split('-'))
+        months = []
+        for _ in range(12):
+            months.insert(0, f"{year:04d}-{month:02d}")
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        labels = ", ".join(f'"{month}"' for month in months)
+        commits = ", ".join(str(self.history['months'].get(month, 0)) for month in months)
+        Ghutils.print_to_buffer(f'''```mermaid
+xychart-beta
+    title "Commits per month"
+    x-axis [{labels}]
+    y-axis "Commits"
+    bar [{commits}]
+```
+''')
+        Ghutils.print_to_buffer("| Contributor | Commits | Lines added | Lines deleted |\n|---|--:|--:|--:|")
+        for email, author in sorted(self.history['authors'].items(), key=lambda item: -item[1]['commits']):
+            login = self.local_logins.get(email)
+            who = f"[{login}](https://github.com/{login})" if login else f"_{author['name']}_"
+            Ghutils.print_to_buffer(f"| {who} | {author['commits']} | {author['additions']} | {author['deletions']} |")
+        Ghutils.print_to_buffer("")
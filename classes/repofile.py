@@ -0,0 +1,29 @@
+import base64
+
+
+class RepoFile:
+    """
+    A file in a repository. The content is only fetched and decoded when it's asked for.
+    """
+    def __init__(self, path: str, text: str = None, loader=None):
+        """
+        Args:
+            path (str): The path of the file in the repository
+            text (str): The content, if it's already known. Default: None
+            loader (callable): Returns the content as a `contents` API response ({'content': base64}) when `text` isn't known. Default: None
+        """
+        self.path = path
+        self.__text = text
+        self.__loader = loader
+
+    @property
+    def content(self):
+        """
+        Returns:
+            str: The content of the file
+        """
+        if self.__text is None and self.__loader is not None:
+            contents = self.__loader()
+            self.__text = base64.b64decode(contents['content']).decode('utf-8')
+            self.__loader = None
+        return self.__text
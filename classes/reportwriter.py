@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+
+
+class ReportWriter:
+    """
+    Writes one report. The main sections go straight to the sink as they are produced, the
+    `<details>` appendix is spooled aside (to disk once it grows) and added to the end by finish().
+    Without a sink the report itself is spooled, so it can be read or copied afterwards.
+    """
+    def __init__(self, sink=None, spool_size: int = 256*1024):
+        """
+        Args:
+            sink (file): Where the report is written, e.g. sys.stdout or an open file. Default: a spooled temporary file
+            spool_size (int): Bytes kept in memory before a spooled file moves to disk. Default: 256 KB
+        """
+        self.owns_sink = sink is None
+        self.sink = tempfile.SpooledTemporaryFile(max_size=spool_size, mode='w+') if sink is None else sink
+        self.__appendix = tempfile.SpooledTemporaryFile(max_size=spool_size, mode='w+')
+        self.finished = False
+
+    def write(self, text: str):
+        self.sink.write(text)
+
+    def write_appendix(self, text: str):
+        self.__appendix.write(text)
+
+    def finish(self):
+        """
+        Add the appendix to the end of the report
+        """
+        if self.finished:
+            return
+        self.__appendix.seek(0)
+        for chunk in iter(lambda: self.__appendix.read(65536), ''):
+            self.write(chunk)
+        self.__appendix.close()
+        self.finished = True
+
+    def copy_to(self, f):
+        """
+        Copy a spooled report to a file
+        Args:
+            f (file): The file
+        """
+        self.finish()
+        self.sink.seek(0)
+        shutil.copyfileobj(self.sink, f)
+
+    def read(self):
+        """
+        Returns:
+            str: The whole of a spooled report
+        """
+        self.finish()
+        self.sink.seek(0)
+        return self.sink.read()
+
+    def close(self):
+        if not self.finished:
+            self.__appendix.close()
+            self.finished = True
+        if self.owns_sink:
+            self.sink.close()
@@ -0,0 +1,171 @@
+import time
+import random
+import logging
+import threading
+
+from .transport import Transport, Response
+
+logger = logging.getLogger(__name__)
+
+
+class RequestScheduler(Transport):
+    """
+    Sends requests through another transport while keeping within GitHub's rate limits.
+    It follows X-RateLimit-Remaining/X-RateLimit-Reset per rate limit resource (core, search, graphql...)
+    and spreads the last part of the budget evenly until the reset. Rate limited requests are retried
+    when GitHub says so (Retry-After or the reset time), server errors with jittered exponential backoff -
+    but only for requests that can safely be sent twice, see Transport.idempotent().
+    """
+    def __init__(self, transport: Transport, max_retries: int = 5, max_in_flight: int = 10, reserve: float = 0.1,
+                 base_delay: float = 1.0, max_delay: float = 900, sleep=time.sleep, clock=time.time):
+        """
+        Args:
+            transport (Transport): The transport that sends the requests
+            max_retries (int): How many times a request is retried. Default: 5
+            max_in_flight (int): The maximum number of concurrent requests - many more trips GitHub's secondary rate limit. Default: 10
+            reserve (float): The part of the budget that is spread evenly until the reset. Default: 0.1
+            base_delay (float): Seconds before the first retry of a server error. Default: 1
+            max_delay (float): The longest wait between two attempts. Default: 900
+            sleep (callable): How to wait. Default: time.sleep
+            clock (callable): How to tell the time. Default: time.time
+        """
+        self.transport = transport
+        self.max_retries = max_retries
+        self.reserve = reserve
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.clock = clock
+        self.requests_sent = 0
+        self.retries = 0
+        self.started = clock()
+        self.__budgets = {}
+        self.__next_slot = {}
+        self.__lock = threading.Lock()
+        self.__in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    @staticmethod
+    def resource(path: str):
+        """
+        Args:
+            path (str): The API path
+        Returns:
+            str: The rate limit resource the path counts against
+        """
+        if path == 'graphql':
+            return 'graphql'
+        if path.startswith('search/'):
+            return 'search'
+        return 'core'
+
+    def budget(self, resource: str = 'core'):
+        """
+        Args:
+            resource (str): The rate limit resource. Default: "core"
+        Returns:
+            int, int, float: Limit, remaining requests and the time of the reset. None, None, None before the first response
+        """
+        with self.__lock:
+            return self.__budgets.get(resource, (None, None, None))
+
+    def request(self, method: str, path: str, body: str = None, headers: dict = None) -> Response:
+        resource = RequestScheduler.resource(path)
+        idempotent = RequestScheduler.idempotent(method, path, body)
+        attempt = 0
+        while True:
+            self.__pace(resource)
+            try:
+                with self.__in_flight:
+                    response = self.transport.request(method, path, body, headers)
+            except OSError as e:
+                if attempt == self.max_retries or not idempotent:
+                    raise
+                delay = self.__backoff(attempt)
+                logger.warning(f"{e} - retrying {path} in {delay:.1f}s")
+            else:
+                with self.__lock:
+                    self.requests_sent += 1
+                self.__update(resource, response)
+                delay = self.__retry_delay(resource, response, attempt, idempotent)
+                if delay is None or attempt == self.max_retries:
+                    response.retries = attempt
+                    return response
+                logger.warning(f"HTTP {response.status} - retrying {path} in {delay:.1f}s")
+            with self.__lock:
+                self.retries += 1
+            attempt += 1
+            self.sleep(delay)
+
+    def __update(self, resource: str, response: Response):
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        resource = response.headers.get('X-RateLimit-Resource', resource)
+        limit = int(response.headers.get('X-RateLimit-Limit', 0)) or None
+        with self.__lock:
+            self.__budgets[resource] = (limit, int(remaining), float(reset))
+
+    def __pace(self, resource: str):
+        limit, remaining, reset = self.budget(resource)
+        if remaining is None:
+            return
+        now = self.clock()
+        if reset <= now:
+            return
+        if remaining == 0:
+            wait = reset - now + 1
+        elif limit is None or remaining < limit * self.reserve:
+            # Running low - spread what's left evenly until the reset
+            interval = (reset - now) / remaining
+            with self.__lock:
+                slot = max(now, self.__next_slot.get(resource, now))
+                self.__next_slot[resource] = slot + interval
+            wait = slot - now
+        else:
+            return
+        if wait > 0:
+            logger.info(f"Rate limit for {resource}: {remaining} left - waiting {wait:.1f}s")
+            self.sleep(min(wait, self.max_delay))
+
+    def __backoff(self, attempt: int):
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def __retry_delay(self, resource: str, response: Response, attempt: int, idempotent: bool = True):
+        # Returns the number of seconds to wait before trying again - None if the response is final
+        if response.status in (500, 502, 503, 504):
+            # The server may have done it anyway - only send again what can be sent twice
+            return self.__backoff(attempt) if idempotent else None
+        if response.status not in (403, 429):
+            return None
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            return min(self.max_delay, float(retry_after))
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            reset = float(response.headers.get('X-RateLimit-Reset', self.clock()))
+            return min(self.max_delay, max(1, reset - self.clock() + 1))
+        if response.status == 429 or 'secondary rate limit' in (response.body or '').lower():
+            # GitHub asks for at least a minute's break after hitting a secondary rate limit
+            return max(60, self.__backoff(attempt))
+        return None
+
+    def projection(self, requests_needed: float, resource: str = 'core'):
+        """
+        Estimate how long it takes to send more requests - at the speed seen so far and within the rate limit.
+        Args:
+            requests_needed (float): The number of requests still to send
+            resource (str): The rate limit resource. Default: "core"
+        Returns:
+            float: Seconds
+        """
+        elapsed = max(self.clock() - self.started, 0.001)
+        seconds = requests_needed * elapsed / max(self.requests_sent, 1)
+        limit, remaining, reset = self.budget(resource)
+        if remaining is not None and requests_needed > remaining:
+            # The rest has to wait for the budget to be reset - once per hour
+            hours = (requests_needed - remaining) / (limit or 5000)
+            seconds = max(seconds, max(0, reset - self.clock()) + int(hours) * 3600)
+        return seconds
+
+    def close(self):
+        self.transport.close()
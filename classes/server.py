@@ -0,0 +1,239 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+import socketserver
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .ghutils import Ghutils
+from .repo import Repo
+
+logger = logging.getLogger(__name__)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ReportServer:
+    """
+    Builds reports on request and keeps them - with the connections, response cache and user
+    names of the process - warm between requests:
+
+        GET /report/{org}/{repo}            the report as Markdown
+        GET /report/{org}/{repo}?format=json  the report and its metrics as JSON (or Accept: application/json)
+        GET /report/{org}/{repo}?refresh=1  build it again, however fresh it is
+        GET /health                         the reports kept and the repositories watched
+
+    Names other than GitHub's - letters, digits, "-", "_" and "." - are answered with 400.
+
+    Concurrent requests for the same repository wait for one build. Watched repositories are
+    rebuilt in the background every `refresh` seconds, the other reports are dropped once they are
+    older than `max_age`. User profiles are looked up again after `max_age` seconds - and on every
+    refresh - so a name fixed on GitHub shows up without a restart.
+    """
+    # What GitHub allows in the name of an owner or repository - "." and ".." aside
+    name_pattern = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8080, socket_path: str = None, max_age: float = 300,
+                 jobs: int = 4, watch: list = (), refresh: float = 3600):
+        """
+        Args:
+            host (str): The address to listen on. Default: 127.0.0.1
+            port (int): The port to listen on - 0 for any free port. Default: 8080
+            socket_path (str): Listen on this Unix socket instead of host and port. Default: None
+            max_age (float): Seconds a report is served before it is built again. Default: 300
+            jobs (int): The number of reports built at the same time. Default: 4
+            watch ([]str): Repositories in the form "org/repo" that are kept fresh in the background. Default: none
+            refresh (float): Seconds between the background builds of the watched repositories. Default: 3600
+        """
+        self.max_age = max_age
+        self.__user_cache_ttl = Ghutils.user_cache_ttl
+        Ghutils.user_cache_ttl = max_age
+        self.watch = list(watch)
+        self.refresh = refresh
+        self.__reports = {}
+        self.__builds = {}
+        # Re-entrant - a build that is done already runs its callback while the lock is held
+        self.__lock = threading.RLock()
+        self.__executor = ThreadPoolExecutor(max_workers=jobs)
+        self.__stop = threading.Event()
+        self.__threads = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def send(self, status: int, content_type: str, text: str, headers: dict = None):
+                payload = text.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                query = urllib.parse.parse_qs(url.query)
+                parts = [urllib.parse.unquote(part) for part in url.path.strip('/').split('/')]
+                as_json = query.get('format', [''])[0] == 'json' or 'application/json' in self.headers.get('Accept', '')
+                if parts == ['health']:
+                    self.send(200, 'application/json', json.dumps(server.health()))
+                    return
+                if len(parts) != 3 or parts[0] != 'report':
+                    self.send(404, 'application/json', json.dumps({'error': f"No such endpoint: {url.path}"}))
+                    return
+                if not all(ReportServer.name_pattern.match(name) and name not in ('.', '..') for name in parts[1:]):
+                    # The names end up in paths of the cache directory
+                    self.send(400, 'application/json', json.dumps({'error': f"No such repository: {'/'.join(parts[1:])}"}))
+                    return
+                try:
+                    report = server.report(parts[1], parts[2], query.get('refresh', ['0'])[0] not in ('0', ''))
+                except Exception as e:
+                    self.send(502, 'application/json', json.dumps({'error': str(e)}))
+                    return
+                headers = {'X-Report-Age': str(int(time.time() - report['built_at']))}
+                if as_json:
+                    self.send(200, 'application/json', json.dumps(report), headers)
+                else:
+                    self.send(200, 'text/markdown', report['report'], headers)
+
+            def log_message(self, format, *args):
+                # There is no client address on a Unix socket
+                logger.info(format % args)
+
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            # Only the user running the server may talk to it - from the moment the socket exists, not after a chmod
+            umask = os.umask(0o177)
+            try:
+                self.server = UnixHTTPServer(socket_path, Handler)
+            finally:
+                os.umask(umask)
+            self.url = f"unix:{socket_path}"
+        else:
+            self.server = ThreadingHTTPServer((host, port), Handler)
+            self.server.daemon_threads = True
+            self.url = f"http://{host}:{self.server.server_address[1]}"
+        self.socket_path = socket_path
+
+    def build(self, org_name: str, repo_name: str) -> dict:
+        """
+        Build the report of a repository - in the calling thread, without coalescing
+        Returns:
+            dict: 'org', 'repo', 'built_at', 'report' (the Markdown) and 'metrics'
+        """
+        try:
+            repo = Repo.build_report(org_name, repo_name)
+        except SystemExit:
+            # Ghutils gives up on errors with sys.exit() - the server must go on
+            Ghutils.take_report().close()
+            raise RuntimeError(f"The report of {org_name}/{repo_name} failed - see the server's stderr")
+        writer = Ghutils.take_report()
+        try:
+            report = writer.read()
+        finally:
+            writer.close()
+        return {'org': org_name, 'repo': repo_name, 'built_at': time.time(), 'report': report, 'metrics': repo.metrics()}
+
+    def report(self, org_name: str, repo_name: str, refresh: bool = False) -> dict:
+        """
+        Get the report of a repository - the one kept if it's fresh enough, otherwise one that is built now.
+        Only one build of a repository runs at a time - everyone asking meanwhile gets its result
+        Args:
+            org_name (str): The organization (or user) owning the repository
+            repo_name (str): The name of the repository
+            refresh (bool): Build it again even if the one kept is fresh. Default: False
+        Returns:
+            dict: What build() returns
+        """
+        key = f"{org_name}/{repo_name}".lower()
+        if refresh:
+            Ghutils.clear_user_cache()
+        with self.__lock:
+            self.__evict()
+            kept = self.__reports.get(key)
+            if kept is not None and not refresh and time.time() - kept['built_at'] < self.max_age:
+                return kept
+            future = self.__builds.get(key)
+            if future is None:
+                future = self.__executor.submit(self.build, org_name, repo_name)
+                self.__builds[key] = future
+                future.add_done_callback(lambda done: self.__built(key, done))
+        return future.result()
+
+    def __built(self, key, future):
+        with self.__lock:
+            self.__builds.pop(key, None)
+            if future.exception() is None:
+                self.__reports[key] = future.result()
+            else:
+                logger.warning(f"{key}: {future.exception()}")
+
+    def __evict(self):
+        # Drop the reports that would be built again anyway - except the watched ones, which are rebuilt in the background
+        watched = {full_name.lower() for full_name in self.watch}
+        now = time.time()
+        for key in [key for key, kept in self.__reports.items() if key not in watched and now - kept['built_at'] >= self.max_age]:
+            del self.__reports[key]
+
+    def health(self) -> dict:
+        with self.__lock:
+            return {'status': 'ok', 'reports': sorted(self.__reports), 'building': sorted(self.__builds), 'watch': self.watch}
+
+    def __refresh_watched(self):
+        while not self.__stop.is_set():
+            for full_name in self.watch:
+                if self.__stop.is_set():
+                    return
+                try:
+                    self.report(*full_name.split('/', maxsplit=1), refresh=True)
+                except Exception as e:
+                    logger.warning(f"{full_name}: {e}")
+            self.__stop.wait(self.refresh)
+
+    def start(self):
+        """
+        Serve - and refresh the watched repositories - in background threads
+        """
+        self.__threads = [threading.Thread(target=self.server.serve_forever, daemon=True)]
+        if self.watch:
+            self.__threads.append(threading.Thread(target=self.__refresh_watched, daemon=True))
+        for thread in self.__threads:
+            thread.start()
+
+    def serve_forever(self):
+        """
+        Serve until interrupted
+        """
+        self.start()
+        try:
+            self.__stop.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.__stop.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+        Ghutils.user_cache_ttl = self.__user_cache_ttl
+        if self.socket_path is not None and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+from .records import IssueRecord
+
+
+class RepoSnapshot:
+    """
+    What was fetched for a repository in the previous run - kept in a JSON file per repository.
+    Used to only fetch what changed since then, and to tell if a report is the same as last time.
+    """
+    def __init__(self, directory: str, org_name: str, repo_name: str):
+        """
+        Args:
+            directory (str): Where the snapshots are kept
+            org_name (str): The organization (or user) owning the repository
+            repo_name (str): The name of the repository
+        """
+        self.path = os.path.join(directory, org_name, f"{repo_name}.json")
+        # The names come from the command line or a request to the report server - "../.." must not lead out of the directory
+        if os.path.dirname(os.path.dirname(os.path.abspath(self.path))) != os.path.abspath(directory):
+            raise ValueError(f"{org_name}/{repo_name} isn't the name of a repository")
+        self.data = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    self.data = json.load(f)
+            except ValueError:
+                # A broken snapshot is as good as none
+                self.data = {}
+
+    def get(self, key: str, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key: str, value):
+        self.data[key] = value
+
+    @staticmethod
+    def now():
+        """
+        Returns:
+            str: The current time in the ISO 8601 form used by GitHub's `since` parameter - a minute early, to allow for clock skew
+        """
+        return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - 60))
+
+    def merge_issues(self, issues: list) -> list:
+        """
+        Merge new and updated issues into the ones in the snapshot
+        Args:
+            issues ([]IssueRecord): The new and updated issues
+        Returns:
+            []json: All the issues known, newest first, with the fields of IssueRecord
+        """
+        merged = {issue['number']: issue for issue in self.data.get('issues', [])}
+        for issue in issues:
+            if not isinstance(issue, IssueRecord):
+                issue = IssueRecord.from_json(issue)
+            merged[issue['number']] = issue.to_dict()
+        self.data['issues'] = sorted(merged.values(), key=lambda issue: issue['number'], reverse=True)
+        return self.data['issues']
+
+    @staticmethod
+    def digest(content: str):
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def report_changed(self, target: str, content: str) -> bool:
+        """
+        Args:
+            target (str): Where the report is published, e.g. "issue"
+            content (str): The report
+        Returns:
+            bool: True if the report differs from the one last published there
+        """
+        return self.data.get('reports', {}).get(target) != RepoSnapshot.digest(content)
+
+    def remember_report(self, target: str, content: str):
+        self.data.setdefault('reports', {})[target] = RepoSnapshot.digest(content)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Write to a temporary file first, so an interrupted run doesn't leave half a snapshot
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(self.path), suffix='.tmp', delete=False) as f:
+            json.dump(self.data, f)
+        os.replace(f.name, self.path)
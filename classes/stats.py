@@ -0,0 +1,157 @@
+import os
+import re
+import json
+import time
+import functools
+import threading
+
+
+class Stats:
+    """
+    Instrumentation of API requests and report sections. It's off by default - then recording
+    is a single check of `Stats.enabled`.
+    """
+    enabled = False
+    __events = []
+    __lock = threading.Lock()
+    __origin = time.perf_counter()
+
+    @staticmethod
+    def enable():
+        """
+        Start recording - anything recorded before is discarded
+        """
+        with Stats.__lock:
+            Stats.__events = []
+            Stats.__origin = time.perf_counter()
+        Stats.enabled = True
+
+    @staticmethod
+    def disable():
+        Stats.enabled = False
+
+    @staticmethod
+    def events():
+        """
+        Returns:
+            []dict: The events recorded so far
+        """
+        with Stats.__lock:
+            return list(Stats.__events)
+
+    @staticmethod
+    def __record(event: dict):
+        with Stats.__lock:
+            Stats.__events.append(event)
+
+    @staticmethod
+    def record_request(method: str, path: str, started: float, response):
+        """
+        Record a request to GitHub's API
+        Args:
+            method (str): The HTTP method
+            path (str): The API path
+            started (float): time.perf_counter() when the request was sent
+            response (Response): The response
+        """
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        Stats.__record({
+            'kind': 'request', 'name': f"{method} {path}", 'thread': threading.get_ident(),
+            'start': started - Stats.__origin, 'duration': time.perf_counter() - started,
+            'status': response.status, 'bytes': len((response.body or '').encode('utf-8')),
+            'cache': getattr(response, 'cache', None), 'retries': getattr(response, 'retries', 0),
+            'rate_limit_remaining': int(remaining) if remaining is not None else None})
+
+    @staticmethod
+    def section(function):
+        """
+        Decorator recording the time spent in a report section
+        """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not Stats.enabled:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                name = function.__qualname__
+                if args and hasattr(args[0], 'org_name'):
+                    name = f"{name} {args[0].org_name}/{args[0].repo_name}"
+                Stats.__record({
+                    'kind': 'section', 'name': name, 'thread': threading.get_ident(),
+                    'start': started - Stats.__origin, 'duration': time.perf_counter() - started})
+        return wrapper
+
+    @staticmethod
+    def endpoint(path: str):
+        """
+        Args:
+            path (str): The API path
+        Returns:
+            str: The path with the owner, repository, login, page etc. replaced - to group similar requests
+        """
+        path = re.sub(r"^(repos|users|orgs)/[^/?]+(/[^/?]+)?", lambda match: match.group(1) + "/{}" + ("/{}" if match.group(2) and match.group(1) == 'repos' else ''), path)
+        return re.sub(r"=[^&]*", "={}", path)
+
+    @staticmethod
+    def summary():
+        """
+        Returns:
+            str: A readable summary of what was recorded
+        """
+        events = Stats.events()
+        requests = [event for event in events if event['kind'] == 'request']
+        sections = [event for event in events if event['kind'] == 'section']
+        lines = [f"Requests: {len(requests)}"]
+        if requests:
+            cache = {}
+            for event in requests:
+                cache[event['cache'] or 'none'] = cache.get(event['cache'] or 'none', 0) + 1
+            remaining = [event['rate_limit_remaining'] for event in requests if event['rate_limit_remaining'] is not None]
+            lines.append(f"  time: {sum(event['duration'] for event in requests):.2f}s (sum), bytes received: {sum(event['bytes'] for event in requests)}")
+            lines.append(f"  cache: " + ", ".join(f"{key} {value}" for key, value in sorted(cache.items())))
+            lines.append(f"  retries: {sum(event['retries'] for event in requests)}, errors: {sum(1 for event in requests if not 200 <= event['status'] < 400)}")
+            if remaining:
+                lines.append(f"  rate limit remaining: {min(remaining)}")
+            endpoints = {}
+            for event in requests:
+                method, path = event['name'].split(' ', 1)
+                totals = endpoints.setdefault(f"{method} {Stats.endpoint(path)}", [0, 0.0, 0])
+                totals[0] += 1
+                totals[1] += event['duration']
+                totals[2] += event['bytes']
+            lines.append("  slowest endpoints:")
+            for name, (count, seconds, size) in sorted(endpoints.items(), key=lambda item: -item[1][1])[:10]:
+                lines.append(f"    {seconds:8.3f}s {count:5d}x {size:10d} bytes  {name}")
+        if sections:
+            lines.append("Sections:")
+            totals = {}
+            for event in sections:
+                name = event['name'].split(' ')[0]
+                totals.setdefault(name, [0, 0.0])
+                totals[name][0] += 1
+                totals[name][1] += event['duration']
+            for name, (count, seconds) in sorted(totals.items(), key=lambda item: -item[1][1]):
+                lines.append(f"  {seconds:8.3f}s {count:5d}x  {name}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def export(path: str, format: str = 'json'):
+        """
+        Write what was recorded to a file
+        Args:
+            path (str): The file
+            format (str): "json" for the events as they are, "trace" for Chrome's trace event format (chrome://tracing, Perfetto). Default: "json"
+        """
+        events = Stats.events()
+        if format == 'trace':
+            data = {'traceEvents': [{
+                'name': event['name'], 'cat': event['kind'], 'ph': 'X', 'pid': os.getpid(), 'tid': event['thread'],
+                'ts': round(event['start'] * 1e6), 'dur': round(event['duration'] * 1e6),
+                'args': {key: value for key, value in event.items() if key not in ('name', 'kind', 'thread', 'start', 'duration')}}
+                for event in events]}
+        else:
+            data = {'events': events}
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=1)
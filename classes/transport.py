@@ -0,0 +1,299 @@
+import json
+import os
+import re
+import subprocess
+import threading
+import queue
+import http.client
+from urllib.parse import urlsplit
+
+
+class Headers(dict):
+    """
+    Response headers. GitHub's header names come in different casing depending on the
+    protocol (`ETag` vs `Etag`), so lookups ignore the case of the name.
+    """
+    def __find(self, key):
+        if dict.__contains__(self, key):
+            return key
+        for name in self.keys():
+            if name.lower() == key.lower():
+                return name
+        return None
+
+    def __getitem__(self, key):
+        name = self.__find(key)
+        if name is None:
+            raise KeyError(key)
+        return dict.__getitem__(self, name)
+
+    def __contains__(self, key):
+        return self.__find(key) is not None
+
+    def get(self, key, default=None):
+        name = self.__find(key)
+        return default if name is None else dict.__getitem__(self, name)
+
+
+class Response:
+    """
+    A response from GitHub's API - regardless of the transport that fetched it.
+    """
+    def __init__(self, status: int, reason: str, headers: Headers, body: str, cache: str = None):
+        """
+        Args:
+            status (int): The HTTP status. 0 if GitHub couldn't be reached
+            reason (str): The reason phrase - or the error if GitHub couldn't be reached
+            headers (Headers): The response headers
+            body (str): The response body
+            cache (str): "hit", "revalidated" or "miss" when the response went through a cache. Default: None
+        """
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.cache = cache
+        self.retries = 0
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def json(self):
+        """
+        Returns:
+            json: The decoded body, None if the body is empty
+        """
+        return json.loads(self.body) if self.body else None
+
+    @property
+    def error(self):
+        """
+        Returns:
+            str: A message describing the failed request in the same form as `gh api` does
+        """
+        if self.status == 0:
+            return self.reason
+        message = self.reason
+        try:
+            message = json.loads(self.body)['message']
+        except (ValueError, TypeError, KeyError):
+            pass
+        return f"gh: {message} (HTTP {self.status})"
+
+
+class Transport:
+    """
+    The way requests get to GitHub's API. Ghutils sends all its requests through a transport.
+    """
+    def request(self, method: str, path: str, body: str = None, headers: dict = None) -> Response:
+        """
+        Send a request to GitHub's API.
+        Args:
+            method (str): The HTTP method (GET, POST, PATCH...)
+            path (str): The API path relative to the API root, e.g. "repos/{org}/{repo}"
+            body (str): The (JSON) body of the request. Default: None
+            headers (dict): Additional request headers. Default: None
+        Returns:
+            Response: The response - also when the status isn't 2xx
+        Raises:
+            OSError: When GitHub couldn't be reached at all
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def find(self, kind):
+        """
+        Find a transport of a given kind among this one and the ones it wraps
+        Args:
+            kind (type): The class of the transport
+        Returns:
+            Transport: The transport - None if there is none of that kind
+        """
+        if isinstance(self, kind):
+            return self
+        wrapped = getattr(self, 'transport', None)
+        return wrapped.find(kind) if isinstance(wrapped, Transport) else None
+
+    @staticmethod
+    def idempotent(method: str, path: str, body: str = None) -> bool:
+        """
+        Whether sending a request again does no harm - a POST that failed with a server error
+        (e.g. creating the report issue) may still have done its job
+        Returns:
+            bool: True for GET, HEAD, OPTIONS, PUT and DELETE, and for GraphQL queries - not mutations
+        """
+        if method.upper() in ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'):
+            return True
+        if method.upper() == 'POST' and path == 'graphql':
+            try:
+                return not json.loads(body)['query'].lstrip().startswith('mutation')
+            except (TypeError, ValueError, KeyError, AttributeError):
+                return False
+        return False
+
+    @staticmethod
+    def default():
+        """
+        Returns the transport to use when none is set explicitly: The HTTP transport if a token
+        can be found, the `gh` CLI otherwise. Set REPOREPORT_TRANSPORT to "gh" or "http" to choose.
+        Returns:
+            Transport: The transport
+        """
+        choice = os.environ.get('REPOREPORT_TRANSPORT', '')
+        if choice == 'gh':
+            return GhCliTransport()
+        token = HttpTransport.find_token()
+        if token is not None or choice == 'http':
+            return HttpTransport(token)
+        return GhCliTransport()
+
+
+class GhCliTransport(Transport):
+    """
+    Sends each request through a `gh api` subprocess.
+    """
+    def request(self, method: str, path: str, body: str = None, headers: dict = None) -> Response:
+        command = ['gh', 'api', '-i', '-X', method, path]
+        for name, value in (headers or {}).items():
+            command.extend(['-H', f"{name}: {value}"])
+        if body is not None:
+            command.extend(['--input', '-'])
+        result = subprocess.run(command, input=body, capture_output=True, text=True)
+        return GhCliTransport.parse_output(result.returncode, result.stdout, result.stderr)
+
+    @staticmethod
+    def parse_output(returncode: int, stdout: str, stderr: str) -> Response:
+        """
+        Turn the output of `gh api -i` into a Response
+        Args:
+            returncode (int): The returncode of `gh`
+            stdout (str): Status line and headers, a blank line and the body
+            stderr (str): The error message from `gh`
+        Returns:
+            Response: The response
+        """
+        status, reason, headers, body = 0, stderr.strip(), Headers(), ''
+        if stdout.startswith("HTTP/"):
+            separator_index = stdout.find('\n\n')
+            if separator_index == -1:
+                separator_index = len(stdout)
+            rawheader = stdout[:separator_index]
+            body = stdout[separator_index + 2:]
+            for line in rawheader.strip().split("\n"):
+                if line.startswith("HTTP/"):
+                    status_line = line.split(" ", 2)
+                    status = int(status_line[1])
+                    reason = status_line[2] if len(status_line) > 2 else ''
+                elif ":" in line:
+                    key, value = line.split(":", 1)
+                    headers[key.strip()] = value.strip()
+        else:
+            match = re.search(r"HTTP (\d+)", stderr)
+            if match:
+                status = int(match.group(1))
+        if returncode != 0 and status != 0 and stderr.strip():
+            # Keep the message from gh - it's what the user is used to see
+            reason = stderr.strip()
+        return Response(status, reason, headers, body)
+
+
+class HttpTransport(Transport):
+    """
+    Talks to GitHub's REST API directly over a pool of keep-alive connections.
+    The token is looked up once, when the transport is created.
+    """
+    def __init__(self, token: str = None, base_url: str = "https://api.github.com", pool_size: int = 8, timeout: float = 30):
+        """
+        Args:
+            token (str): The token to authenticate with. Default: looked up with find_token()
+            base_url (str): The root of the API. Default: "https://api.github.com"
+            pool_size (int): The maximum number of idle connections kept open. Default: 8
+            timeout (float): Seconds to wait for GitHub. Default: 30
+        """
+        self.token = token if token is not None else HttpTransport.find_token()
+        url = urlsplit(base_url)
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.__pool = queue.LifoQueue()
+        self.__lock = threading.Lock()
+        self.connections_opened = 0
+
+    @staticmethod
+    def find_token():
+        """
+        Returns:
+            str: The token from GH_TOKEN, GITHUB_TOKEN or `gh auth token`. None if there is none
+        """
+        for variable in ['GH_TOKEN', 'GITHUB_TOKEN']:
+            if os.environ.get(variable):
+                return os.environ[variable]
+        try:
+            result = subprocess.run(['gh', 'auth', 'token'], capture_output=True, text=True)
+        except OSError:
+            return None
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+        return None
+
+    def __acquire(self):
+        try:
+            return self.__pool.get_nowait()
+        except queue.Empty:
+            with self.__lock:
+                self.connections_opened += 1
+            if self.scheme == 'http':
+                return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+
+    def __release(self, connection):
+        if self.__pool.qsize() < self.pool_size:
+            self.__pool.put(connection)
+        else:
+            connection.close()
+
+    def request(self, method: str, path: str, body: str = None, headers: dict = None) -> Response:
+        url = path if path.startswith('/') else f"{self.prefix}/{path}"
+        request_headers = {
+            'Accept': 'application/vnd.github+json',
+            'User-Agent': 'reporeport',
+            'X-GitHub-Api-Version': '2022-11-28'}
+        if self.token:
+            request_headers['Authorization'] = f"Bearer {self.token}"
+        request_headers.update(headers or {})
+        data = body.encode('utf-8') if body is not None else None
+
+        # A keep-alive connection may have been closed by the server while idle - then retry once on a new one.
+        # Once the request went out GitHub may have acted on it, so only if sending it twice does no harm
+        idempotent = Transport.idempotent(method, path, body)
+        for attempt in range(2):
+            connection = self.__acquire()
+            sent = False
+            try:
+                connection.request(method, url, body=data, headers=request_headers)
+                sent = True
+                response = connection.getresponse()
+                payload = response.read()
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if attempt == 1 or sent and not idempotent:
+                    raise
+                continue
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self.__release(connection)
+            return Response(response.status, response.reason, Headers(response.getheaders()), payload.decode('utf-8'))
+
+    def close(self):
+        while not self.__pool.empty():
+            self.__pool.get_nowait().close()
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import pytest
+
+# Add the subdirectory containing the classes to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.transport import Transport, Response, Headers
+from classes.batch import RepoBatch
+
+
+def repository(owner, name):
+    return {
+        'name': name, 'description': None, 'url': f'https://github.com/{owner}/{name}', 'pushedAt': '2023-06-01T10:00:00Z',
+        'owner': {'login': owner, 'url': f'https://github.com/{owner}'},
+        'open_issues': {'totalCount': 1}, 'closed_issues': {'totalCount': 2},
+        'open_prs': {'totalCount': 3}, 'closed_prs': {'totalCount': 4},
+        'f0': {'isTruncated': False, 'text': f'# {name}'}, 'f1': None,
+        'defaultBranchRef': {'target': {'history': {'nodes': [
+            {'oid': 'abc', 'message': 'Initial commit', 'committedDate': '2023-06-01T10:00:00Z',
+             'author': {'name': 'Octo Cat', 'email': 'octo@example.com', 'user': {'login': 'octocat'}}}]}}}}
+
+
+class BatchTransport(Transport):
+    """Fails queries for more than 4 repositories - like GitHub does when a query is too big"""
+    def __init__(self):
+        self.sizes = []
+
+    def request(self, method, path, body=None, headers=None):
+        if path.startswith('orgs/'):
+            names = ['Wishlist-a', 'wishlist-b', 'Other']
+            return Response(200, 'OK', Headers(), json.dumps([{'name': name, 'full_name': f'kea/{name}'} for name in names]))
+        variables = json.loads(body)['variables']
+        size = len(variables) // 2
+        self.sizes.append(size)
+        if size > 4:
+            return Response(502, 'Bad Gateway', Headers(), '')
+        data = {'rateLimit': {'cost': 1, 'remaining': 4999}}
+        for n in range(size):
+            owner, name = variables[f"o{n}"], variables[f"n{n}"]
+            data[f"r{n}"] = None if name == 'missing' else repository(owner, name)
+        return Response(200, 'OK', Headers(), json.dumps({'data': data}))
+
+
+@pytest.fixture
+def batch_transport(use_transport):
+    return use_transport(BatchTransport())
+
+
+@pytest.mark.batch
+def test_fetch_adapts_batch_size(batch_transport):
+    # Arrange
+    repos = [f"kea/repo{number}" for number in range(10)] + ["kea/missing"]
+    batch = RepoBatch(['README.md', 'LICENSE'], batch_size=8)
+    # Act
+    prefetched = batch.fetch(repos)
+    # Assert
+    assert batch_transport.sizes[:2] == [8, 4]
+    assert sorted(prefetched) == sorted(repos[:10])
+    repo = prefetched['kea/repo3']
+    assert repo['repo']['owner']['login'] == 'kea'
+    assert repo['counts'] == {'open_issues': 1, 'closed_issues': 2, 'open_prs': 3, 'closed_prs': 4}
+    assert repo['files']['README.md'].content == '# repo3'
+    assert repo['files']['LICENSE'] is None
+    assert repo['commits'][0]['author']['login'] == 'octocat'
+    assert batch.queries < len(repos)
+
+
+@pytest.mark.batch
+def test_discover_matches_names(batch_transport):
+    # Act / Assert
+    assert RepoBatch.discover('kea', 'Wishlist*') == ['kea/Wishlist-a', 'kea/wishlist-b']
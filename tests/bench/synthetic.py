@@ -0,0 +1,64 @@
+import re
+import json
+
+from classes.transport import Transport, Response, Headers
+
+
+class SyntheticGitHub(Transport):
+    """
+    A made-up GitHub with one repository of a given size. It answers the REST and GraphQL
+    requests reporeport makes, with pagination and Link headers like GitHub's.
+    """
+    def __init__(self, owner='kea', name='synthetic', issues=10, prs=5, contributors=3):
+        self.owner = owner
+        self.name = name
+        self.issues = [{'number': number, 'title': f"Issue {number}", 'state': 'open' if number % 3 else 'closed',
+                        'html_url': f"https://github.com/{owner}/{name}/issues/{number}",
+                        'user': {'login': f"user{number % max(contributors, 1)}"}, 'labels': [], 'body': 'x' * 200}
+                       for number in range(issues + prs, 0, -1)]
+        for issue in self.issues[:prs]:
+            issue['pull_request'] = {'url': issue['html_url']}
+        self.contributors = [{'login': f"user{number}", 'html_url': f"https://github.com/user{number}",
+                              'contributions': 1000 - number} for number in range(contributors)]
+
+    def page(self, path, items):
+        per_page = int((re.search(r"[?&]per_page=(\d+)", path) or [None, 30])[1])
+        page = int((re.search(r"[?&]page=(\d+)", path) or [None, 1])[1])
+        last = max(1, -(-len(items) // per_page))
+        headers = Headers()
+        if last > 1:
+            base = re.sub(r"([?&])page=\d+", "", path)
+            headers['Link'] = f'<https://api.github.com/{base}&page={page + 1}>; rel="next", <https://api.github.com/{base}&page={last}>; rel="last"'
+        return Response(200, 'OK', headers, json.dumps(items[(page - 1) * per_page:page * per_page]))
+
+    def graphql(self, query, variables):
+        if 'user(login:' in query:
+            return {alias: {'login': login, 'name': None if login.endswith('7') else login.title()} for alias, login in variables.items()}
+        counts = {'open_issues': {'totalCount': sum(1 for issue in self.issues if 'pull_request' not in issue and issue['state'] == 'open')},
+                  'closed_issues': {'totalCount': sum(1 for issue in self.issues if 'pull_request' not in issue and issue['state'] == 'closed')},
+                  'open_prs': {'totalCount': sum(1 for issue in self.issues if 'pull_request' in issue and issue['state'] == 'open')},
+                  'closed_prs': {'totalCount': sum(1 for issue in self.issues if 'pull_request' in issue and issue['state'] == 'closed')}}
+        files = {alias: ({'isTruncated': False, 'text': f"Content of {expression}\n" * 20} if expression != 'HEAD:CONTRIBUTE.md' else None)
+                 for alias, expression in variables.items() if alias.startswith('f')}
+        return {'repository': {**counts, **files}}
+
+    def request(self, method, path, body=None, headers=None):
+        repo = f"repos/{self.owner}/{self.name}"
+        base = path.split('?')[0]
+        if path == 'graphql':
+            request = json.loads(body)
+            return Response(200, 'OK', Headers(), json.dumps({'data': self.graphql(request['query'], request['variables'])}))
+        if base == repo:
+            return Response(200, 'OK', Headers(), json.dumps({
+                'name': self.name, 'full_name': f"{self.owner}/{self.name}", 'description': 'A synthetic repository',
+                'html_url': f"https://github.com/{self.owner}/{self.name}", 'pushed_at': '2023-06-01T10:00:00Z',
+                'owner': {'login': self.owner, 'html_url': f"https://github.com/{self.owner}"}}))
+        if base == f"{repo}/contributors":
+            return self.page(path, self.contributors)
+        if base == f"{repo}/commits":
+            return self.page(path, [{'sha': f"{number:040x}"} for number in range(100)])
+        if base == f"{repo}/issues":
+            return self.page(path, self.issues)
+        if base == f"{repo}/pulls":
+            return self.page(path, [issue for issue in self.issues if 'pull_request' in issue])
+        return Response(404, 'Not Found', Headers(), json.dumps({'message': 'Not Found'}))
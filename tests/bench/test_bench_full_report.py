@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import tracemalloc
+import pytest
+
+# Add the root of the repository - for the classes package - and the synthetic GitHub next to this file - to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))
+)
+
+from classes.ghutils import Ghutils
+from classes.repo import Repo
+from classes.replay import ReplayTransport, RecordingTransport, ReplayServer
+from classes.transport import HttpTransport
+from synthetic import SyntheticGitHub
+
+# Each size: the synthetic repository and what a full report may cost at most. The requests don't grow
+# with the issues and PRs - only with the contributors: a page per 100 and a user lookup per 50
+SIZES = {
+    'small': {'repo': {'issues': 10, 'prs': 5, 'contributors': 3}, 'seconds': 1, 'requests': 8, 'megabytes': 5},
+    'medium': {'repo': {'issues': 1000, 'prs': 200, 'contributors': 50}, 'seconds': 1, 'requests': 8, 'megabytes': 10},
+    'huge': {'repo': {'issues': 10000, 'prs': 2000, 'contributors': 500}, 'seconds': 2, 'requests': 8 + 4 + 9, 'megabytes': 20},
+}
+
+
+@pytest.fixture
+def replay():
+    def start(latency=0.0, **size):
+        transport = ReplayTransport(fallback=SyntheticGitHub(**size), latency=latency)
+        Ghutils.set_transport(transport)
+        Ghutils.clear_user_cache()
+        return transport
+    yield start
+    Ghutils.set_transport(None)
+    Ghutils.clear_user_cache()
+
+
+@pytest.mark.bench
+@pytest.mark.parametrize('size', SIZES.keys())
+def test_bench_full_report(replay, tmp_path, size):
+    # Arrange
+    budget = SIZES[size]
+    transport = replay(latency=0.005, **budget['repo'])
+    # Act
+    tracemalloc.start()
+    started = time.perf_counter()
+    Repo.full_report('kea', 'synthetic', str(tmp_path / "report.md"))
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Assert
+    print(f"\n{size}: {seconds:.3f}s, {len(transport.requests)} requests, {peak / 1024 / 1024:.1f} MB peak")
+    assert "## [kea](https://github.com/kea)/[synthetic]" in (tmp_path / "report.md").read_text()
+    assert seconds < budget['seconds']
+    assert len(transport.requests) <= budget['requests']
+    assert peak < budget['megabytes'] * 1024 * 1024
+
+
+@pytest.mark.bench
+def test_bench_issue_lookup_fetches_pages_concurrently(replay):
+    # Arrange - 120 pages of issues, 20 ms each
+    transport = replay(latency=0.02, **SIZES['huge']['repo'])
+    my_ghrepo = Repo('kea', 'synthetic')
+    # Act
+    started = time.perf_counter()
+    number = my_ghrepo.get_issue_by_title("^Issue 42$")
+    seconds = time.perf_counter() - started
+    # Assert
+    assert number == 42
+    assert seconds < 120 * 0.02 / 2
+
+
+@pytest.mark.bench
+def test_record_then_replay_over_http(replay, tmp_path):
+    # Arrange - record a report from the synthetic GitHub
+    synthetic = replay(**SIZES['small']['repo'])
+    Ghutils.set_transport(RecordingTransport(synthetic, str(tmp_path / "fixtures")))
+    Repo.full_report('kea', 'synthetic', str(tmp_path / "recorded.md"))
+    Ghutils.clear_user_cache()
+    # Act - replay it through a local server and the HTTP transport
+    replayed = ReplayTransport(str(tmp_path / "fixtures"))
+    with ReplayServer(replayed) as server:
+        http_transport = HttpTransport(token='replay', base_url=server.url)
+        Ghutils.set_transport(http_transport)
+        Repo.full_report('kea', 'synthetic', str(tmp_path / "replayed.md"))
+        http_transport.close()
+    # Assert
+    assert (tmp_path / "replayed.md").read_text() == (tmp_path / "recorded.md").read_text()
+    assert len(replayed.requests) == len(synthetic.requests)
+    assert http_transport.connections_opened == 1
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import subprocess
+import pytest
+
+ROOT = os.path.abspath(os.path.dirname(os.path.abspath(__file__))+"/../..")
+
+# What starting up may cost at most
+HELP_SECONDS = 0.5
+IMPORT_SECONDS = 0.3
+
+
+def run(args, cwd):
+    return subprocess.run([sys.executable] + args, cwd=cwd, capture_output=True, text=True)
+
+
+@pytest.mark.bench
+def test_bench_help(tmp_path):
+    # Act
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        result = run([os.path.join(ROOT, 'reporeport'), '--help'], tmp_path)
+        timings.append(time.perf_counter() - started)
+    imports = run(['-X', 'importtime', os.path.join(ROOT, 'reporeport'), '--help'], tmp_path).stderr
+    # Assert
+    print(f"\n--help: {min(timings):.3f}s")
+    assert result.returncode == 0 and '--repo' in result.stdout
+    assert min(timings) < HELP_SECONDS
+    assert 'classes' not in imports and 'sqlite3' not in imports
+
+
+@pytest.mark.bench
+def test_bench_import(tmp_path):
+    # Arrange
+    script = (
+        "import sys, time, logging\n"
+        f"sys.path.append({ROOT!r})\n"
+        "started = time.perf_counter()\n"
+        "import classes.repo\n"
+        "print(time.perf_counter() - started, len(logging.getLogger().handlers))\n")
+    # Act
+    result = run(['-c', script], tmp_path)
+    # Assert
+    seconds, handlers = result.stdout.split()
+    print(f"\nimport classes.repo: {float(seconds):.3f}s")
+    assert result.returncode == 0, result.stderr
+    assert float(seconds) < IMPORT_SECONDS
+    assert handlers == '0'
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.bench
+def test_setup_logging(tmp_path):
+    # Arrange
+    script = (
+        "import sys, logging\n"
+        f"sys.path.append({ROOT!r})\n"
+        "from classes.ghutils import Ghutils\n"
+        "Ghutils.setup_logging('logs/app.log')\n"
+        "logging.getLogger('classes.repo').debug('hello')\n")
+    # Act
+    result = run(['-c', script], tmp_path)
+    # Assert
+    assert result.returncode == 0, result.stderr
+    assert 'hello' in (tmp_path / 'logs' / 'app.log').read_text()
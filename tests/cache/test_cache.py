@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import pytest
+
+# Add the subdirectory containing the classes to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.transport import Transport, Response, Headers
+from classes.cache import ResponseCache, CachingTransport
+
+
+class FakeTransport(Transport):
+    """Answers 304 when the client already has the current ETag"""
+    def __init__(self):
+        self.requests = []
+
+    def request(self, method, path, body=None, headers=None):
+        self.requests.append((path, dict(headers or {})))
+        if (headers or {}).get('If-None-Match') == '"v1"':
+            return Response(304, 'Not Modified', Headers({'X-RateLimit-Remaining': '4999'}), '')
+        return Response(200, 'OK', Headers({'ETag': '"v1"', 'X-RateLimit-Remaining': '4998'}), json.dumps({'path': path, 'padding': 'x' * 2000}))
+
+
+@pytest.mark.cache
+def test_fresh_entries_are_served_without_a_request(tmp_path):
+    # Arrange
+    fake = FakeTransport()
+    transport = CachingTransport(fake, ResponseCache(str(tmp_path / "responses.sqlite"), ttl=3600))
+    # Act
+    first = transport.request('GET', 'repos/octo/repo')
+    second = transport.request('GET', 'repos/octo/repo')
+    # Assert
+    assert first.cache == 'miss'
+    assert second.cache == 'hit'
+    assert second.json()['path'] == 'repos/octo/repo'
+    assert len(fake.requests) == 1
+
+
+@pytest.mark.cache
+def test_stale_entries_are_revalidated_across_processes(tmp_path):
+    # Arrange - a second cache on the same file stands in for the next run
+    fake = FakeTransport()
+    CachingTransport(fake, ResponseCache(str(tmp_path / "responses.sqlite"), ttl=0)).request('GET', 'repos/octo/repo')
+    transport = CachingTransport(fake, ResponseCache(str(tmp_path / "responses.sqlite"), ttl=0))
+    # Act
+    response = transport.request('GET', 'repos/octo/repo')
+    # Assert
+    assert response.cache == 'revalidated'
+    assert response.json()['path'] == 'repos/octo/repo'
+    assert response.headers['X-RateLimit-Remaining'] == '4999'
+    assert fake.requests[1][1]['If-None-Match'] == '"v1"'
+
+
+@pytest.mark.cache
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    # Arrange
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=300)
+    transport = CachingTransport(FakeTransport(), cache)
+    # Act
+    for number in range(10):
+        transport.request('GET', f'repos/octo/repo{number}')
+    # Assert
+    assert cache.size <= 300
+    assert cache.get('repos/octo/repo9')[0] is not None
+    assert cache.get('repos/octo/repo0')[0] is None
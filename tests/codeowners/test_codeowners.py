@@ -0,0 +1,146 @@
+import os
+import sys
+import json
+import fnmatch
+import subprocess
+import pytest
+
+# Add the root of the repository - for the classes package - to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.codeowners import CodeOwners
+from classes.localcheckout import LocalCheckout
+from classes.ghutils import Ghutils
+from classes.transport import Transport, Response, Headers
+
+SAMPLE = os.path.dirname(os.path.abspath(__file__))+"/../../CODEOWNERS"
+
+
+@pytest.fixture
+def sample():
+    with open(SAMPLE) as f:
+        return CodeOwners(f.read())
+
+
+@pytest.mark.codeowners
+@pytest.mark.parametrize('path, owners', [
+    ('main.py', ['@global-owner1', '@global-owner2']),
+    ('web/app.js', ['@js-owner']),
+    ('cmd/main.go', ['docs@example.com']),
+    ('notes.txt', ['@octo-org/octocats']),
+    ('build/logs/out.log', ['@octocat']),               # **/logs wins over /build/logs/ - it comes later
+    ('deeply/nested/logs/x.py', ['@octocat']),
+    ('docs/getting-started.md', ['@doctocat']),
+    ('docs/build-app/troubleshooting.md', ['@doctocat']),
+    ('src/apps/main.c', ['@octocat']),                  # apps/ at any depth
+    ('apps/main.c', ['@octocat']),
+    ('apps/github/main.c', []),                         # the rule without owners
+    ('scripts/deploy.sh', ['@doctocat', '@octocat']),
+])
+def test_sample_last_match_wins(sample, path, owners):
+    # Act & Assert
+    assert sample.owners(path) == owners
+
+
+@pytest.mark.codeowners
+def test_patterns():
+    # Arrange
+    codeowners = CodeOwners("\n".join([
+        "docs/*  @children",        # 1: the files directly in docs - not further down
+        "/src/**/*.c @c",           # 2
+        "lib/ @lib",                # 3: a directory at any depth - not a file
+        "Makefile @make",           # 4
+        "\\#notes @hash",           # 5: escaped - not a comment
+        "!keep @nobody",            # 6: negation isn't supported
+        "*.md @docs  # inline comment",
+        "src/*/generated/ @gen",
+        "*.md bad-owner",
+    ]))
+    # Act & Assert
+    assert codeowners.owners('docs/a.txt') == ['@children']
+    assert codeowners.owners('docs/sub/a.txt') == []
+    assert codeowners.owners('src/a/b/x.c') == ['@c'] and codeowners.owners('src/x.c') == ['@c']
+    assert codeowners.owners('other/src/x.c') == []
+    assert codeowners.owners('x/lib/y.py') == ['@lib'] and codeowners.owners('lib') == []
+    assert codeowners.owners('a/Makefile') == ['@make']
+    assert codeowners.owners('#notes') == ['@hash']
+    assert codeowners.owners('docs/README.md') == ['@docs']
+    assert codeowners.owners('src/a/generated/x.c') == ['@gen']
+    assert [number for number, _, _ in codeowners.errors] == [6, 9]
+
+
+@pytest.mark.codeowners
+def test_coverage():
+    # Arrange
+    codeowners = CodeOwners("* @all\n*.py @py\n/unused/ @ghost\n/vendor/\n*.py @py2\n")
+    paths = ['README.md', 'a.py', 'b/c.py', 'vendor/lib.js', 'vendor/x.py']
+    # Act
+    coverage = codeowners.coverage(paths)
+    # Assert
+    assert coverage['files'] == 5
+    assert coverage['unowned'] == ['vendor/lib.js']
+    # Never matching, or always beaten by a later rule
+    assert [rule.pattern for rule in coverage['dead_rules']] == ['*.py', '/unused/']
+    assert coverage['owners'] == {'@py2': 3, '@all': 1, '@py': 0, '@ghost': 0}
+
+
+@pytest.mark.codeowners
+def test_tree_from_clone_and_api(tmp_path, use_transport):
+    # Arrange
+    subprocess.run(['git', 'init', '-q', str(tmp_path)], check=True)
+    (tmp_path / 'src').mkdir()
+    for path in ['README.md', 'src/main.py', 'src/util.py']:
+        (tmp_path / path).write_text('x\n')
+    subprocess.run(['git', '-C', str(tmp_path), 'add', '-A'], check=True)
+    subprocess.run(['git', '-C', str(tmp_path), '-c', 'user.name=Mona', '-c', 'user.email=mona@example.com',
+                    'commit', '-q', '-m', 'Files'], check=True)
+    (tmp_path / 'new.txt').write_text('x\n')
+
+    class TreeTransport(Transport):
+        def request(self, method, path, body=None, headers=None):
+            assert path == 'repos/org/repo/git/trees/HEAD?recursive=1'
+            return Response(200, 'OK', Headers(), json.dumps({'truncated': False, 'tree': [
+                {'path': 'src', 'type': 'tree'}, {'path': 'src/main.py', 'type': 'blob'}]}))
+    use_transport(TreeTransport())
+    # Act
+    head = LocalCheckout(str(tmp_path)).tree()
+    worktree = LocalCheckout(str(tmp_path / 'src'), worktree=True).tree()
+    api = Ghutils.get_tree('org', 'repo')
+    # Assert
+    assert head == ['README.md', 'src/main.py', 'src/util.py']
+    assert sorted(worktree) == ['README.md', 'new.txt', 'src/main.py', 'src/util.py']
+    assert api == (['src/main.py'], False)
+
+
+@pytest.mark.codeowners
+@pytest.mark.bench
+def test_monorepo_is_fast():
+    # Arrange - 100,000 files and 300 rules of every kind
+    paths = [f"services/svc{service}/{kind}/module{module}/file{index}.{extension}"
+             for service in range(100) for kind in ('src', 'test') for module in range(50)
+             for index, extension in enumerate(('py', 'js', 'go', 'md', 'c', 'h', 'txt', 'json', 'yml', 'sh'))]
+    rules = ["* @org/everyone"]
+    for service in range(100):
+        rules += [f"/services/svc{service}/ @org/team{service}", f"/services/svc{service}/test/**/*.py @org/qa{service}"]
+    rules += [f"*.{extension} @org/{extension}" for extension in ('md', 'json', 'yml')]
+    rules += [f"module{module}/ @org/module{module}" for module in range(0, 50, 5)]
+    rules += ["**/module7/file3.* @org/seven", "/services/svc0/src/module0/file0.py @mona"]
+    rules += ["**/module3/ @org/three", "*/svc5/*/module2 @org/two", "file?.m* @org/docs", "*/svc9/*/module4?/ @org/forties"]
+    rules += [f"/nothing{index}/ @ghost" for index in range(300 - len(rules))]
+    # Act
+    codeowners = CodeOwners("\n".join(rules))
+    coverage = codeowners.coverage(paths)
+    # Assert - the same owners as trying every rule on every file
+    assert coverage['files'] == 100_000 and coverage['unowned'] == []
+    for path in paths[::997] + ['services/svc0/src/module0/file0.py', 'services/svc3/test/module7/file3.md', 'services/svc5/src/module2/file1.js',
+                                 'services/svc9/test/module42/file9.sh', 'services/svc1/src/module3/file3.md']:
+        expected = None
+        for rule in codeowners.rules:
+            directories = [path] + [path.rsplit('/', depth)[0] for depth in range(1, path.count('/') + 1)]
+            body = rule.pattern.strip('/')
+            if any(fnmatch.fnmatchcase(directory if '/' in rule.pattern.rstrip('/') else directory.rsplit('/', 1)[-1], body.replace('**/', '*'))
+                   for directory in (directories if not rule.pattern.endswith('/') else directories[1:])):
+                expected = rule
+        assert codeowners.rule_for(path) is expected
@@ -0,0 +1,79 @@
+import io
+import os
+import sys
+import json
+import time
+import pytest
+
+# Add the subdirectory containing the classes to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.collaborators import CollaboratorAudit
+from classes.transport import Transport, Response, Headers
+
+
+class CollaboratorsTransport(Transport):
+    """Every repository has as many collaborators as the number in its name - "org/missing" doesn't exist"""
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def request(self, method, path, body=None, headers=None):
+        time.sleep(self.latency)
+        repo = path.split('/')[2]
+        if repo == 'missing':
+            return Response(404, 'Not Found', Headers(), json.dumps({'message': 'Not Found'}))
+        count = int(repo.lstrip('r'))
+        page = int(path.split('page=')[-1])
+        last = max(1, -(-count // 100))
+        headers = Headers()
+        if last > 1:
+            headers['Link'] = f'<https://api.github.com/{path.rsplit("&page=", 1)[0]}&page={last}>; rel="last"'
+        users = [{'login': f"user{number}", 'html_url': f"https://github.com/user{number}", 'role_name': 'write', 'id': number}
+                 for number in range((page - 1) * 100, min(page * 100, count))]
+        return Response(200, 'OK', headers, json.dumps(users))
+
+
+@pytest.fixture
+def transport(use_transport):
+    return use_transport(CollaboratorsTransport())
+
+
+@pytest.mark.collaborators
+def test_all_pages_in_order_and_failures_reported(transport, capsys):
+    # Arrange
+    out = io.StringIO()
+    # Act
+    failed = CollaboratorAudit(jobs=4).run(['org/r250', 'org/missing', 'org/r2'], out, 'ndjson')
+    # Assert
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert failed == 1
+    assert len(rows) == 250 + 1 + 2
+    assert [row['repo'] for row in rows] == ['org/r250'] * 250 + ['org/missing'] + ['org/r2'] * 2
+    assert rows[249] == {'repo': 'org/r250', 'login': 'user249', 'html_url': 'https://github.com/user249', 'role': 'write'}
+    assert 'error' in rows[250]
+    assert 'org/missing failed' in capsys.readouterr().err
+
+
+@pytest.mark.collaborators
+def test_text_and_tsv(transport):
+    # Arrange
+    text, tsv = io.StringIO(), io.StringIO()
+    # Act
+    CollaboratorAudit().run(['org/r1'], text)
+    CollaboratorAudit().run(['org/r1'], tsv, 'tsv')
+    # Assert
+    assert text.getvalue() == "org/r1 https://github.com/user0 user0\n"
+    assert tsv.getvalue() == "repo\tlogin\thtml_url\trole\norg/r1\tuser0\thttps://github.com/user0\twrite\n"
+
+
+@pytest.mark.collaborators
+def test_repositories_are_fetched_concurrently(transport):
+    # Arrange
+    transport.latency = 0.05
+    # Act
+    started = time.perf_counter()
+    CollaboratorAudit(jobs=20).run([f'org/r{number}' for number in range(1, 21)], io.StringIO())
+    # Assert
+    assert time.perf_counter() - started < 0.5
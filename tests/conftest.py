@@ -0,0 +1,76 @@
+import os
+import sys
+import subprocess
+import pytest
+
+# Add the root of the repository - for the classes package - to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/.."
+)
+
+from classes.ghutils import Ghutils
+
+
+@pytest.fixture
+def git_commit():
+    """
+    Commit files to a git repository: git_commit(path, name, email, {file: content}, date=None)
+    """
+    def commit(path, name, email, files, date=None):
+        for file, content in files.items():
+            (path / file).write_text(content)
+        env = dict(os.environ, GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date) if date is not None else None
+        subprocess.run(['git', '-C', str(path), 'add', '-A'], check=True)
+        subprocess.run(['git', '-C', str(path), '-c', f'user.name={name}', '-c', f'user.email={email}',
+                        'commit', '-q', '-m', f'{name} was here'], check=True, env=env)
+    return commit
+
+
+@pytest.fixture
+def use_transport():
+    """
+    Send Ghutils' requests through a fake transport: use_transport(transport) returns the transport.
+    The default transport - and an empty user cache - are back after the test, whether it passed or not
+    """
+    def install(transport):
+        Ghutils.set_transport(transport)
+        return transport
+    yield install
+    Ghutils.set_transport(None)
+    Ghutils.clear_user_cache()
+
+
+@pytest.fixture
+def fake_github(monkeypatch):
+    """
+    Answer the queries of a report with canned data instead of asking GitHub:
+    fake_github(query_github=None, files=None, name=None). Any repository exists, with 1 open and 2 closed
+    issues, 3 open and 4 closed PRs.
+    Args:
+        query_github (callable): Answers Ghutils.query_github(ghapi) - default: (0, [])
+        files (callable): Answers Ghutils.get_files(owner, repo, paths) - default: none of the files exist
+        name (str): The name of every user - default: None
+    Returns:
+        []str: The APIs passed to Ghutils.query_github, as they are asked
+    """
+    def install(query_github=None, files=None, name=None):
+        requests = []
+
+        def query(ghapi, die_on_error=True):
+            requests.append(ghapi)
+            return query_github(ghapi) if query_github is not None else (0, [])
+
+        def query_incl_header(ghapi, die_on_error=True):
+            org, repo_name = ghapi.split("/")[1:3]
+            repo = {'name': repo_name, 'html_url': f'https://github.com/{org}/{repo_name}', 'description': None,
+                    'pushed_at': '2023-06-01T10:00:00Z', 'owner': {'login': org, 'html_url': f'https://github.com/{org}'}}
+            return 0, repo, {'Status-Code': '200'}
+
+        monkeypatch.setattr(Ghutils, 'query_github', query)
+        monkeypatch.setattr(Ghutils, 'query_github_incl_header', query_incl_header)
+        monkeypatch.setattr(Ghutils, 'get_issue_pr_counts', lambda owner, repo: {
+            'open_issues': 1, 'closed_issues': 2, 'open_prs': 3, 'closed_prs': 4})
+        monkeypatch.setattr(Ghutils, 'get_files', files or (lambda owner, repo, paths: {path: None for path in paths}))
+        monkeypatch.setattr(Ghutils, 'get_users', lambda logins: {login: {'login': login, 'name': name} for login in logins})
+        return requests
+    return install
@@ -1,5 +1,9 @@
 import os
+import re
 import sys
+import json
+import base64
+import time
 import pytest
 
 # Add the subdirectory containing the classes to the general class_path
@@ -8,6 +12,7 @@ sys.path.append(
 )
 
 from classes.ghutils import Ghutils
+from classes.transport import Transport, Response, Headers
 
 @pytest.fixture
 def org_repo():
@@ -59,4 +64,149 @@ def test_bad_ghutils_query_github_incl_headers(badapi, die_on_error=False):
     
     #Assert
     assert returncode == expected_returncode
-    assert responseheader["Status-Code"] == expected_status_code
\ No newline at end of file
+    assert responseheader["Status-Code"] == expected_status_code
+
+class PagedTransport(Transport):
+    """Serves 250 numbered items, 100 per page, with a Link header like GitHub's"""
+    def __init__(self, items=250):
+        self.items = items
+        self.pages = []
+
+    def request(self, method, path, body=None, headers=None):
+        page = int(re.search(r"[?&]page=(\d+)", path).group(1))
+        self.pages.append(page)
+        last = -(-self.items // 100)
+        # Let the later pages arrive first
+        time.sleep(0.05 * (last - page))
+        link = Headers()
+        if last > 1:
+            link['Link'] = f'<https://api.github.com/{path}&page={last}>; rel="last"'
+        body = [{'number': number} for number in range((page - 1) * 100, min(page * 100, self.items))]
+        return Response(200, 'OK', link, json.dumps(body))
+
+
+@pytest.fixture
+def paged_transport(use_transport):
+    return use_transport(PagedTransport())
+
+
+@pytest.mark.ghutils
+def test_ghutils_query_github_allpages_merges_pages_in_order(paged_transport):
+    # Act
+    returncode, issues = Ghutils.query_github_allpages("repos/octo/repo/issues?state=all")
+    # Assert
+    assert returncode == 0
+    assert [issue['number'] for issue in issues] == list(range(250))
+    assert sorted(paged_transport.pages) == [1, 2, 3]
+
+
+@pytest.mark.ghutils
+def test_ghutils_iter_pages_streams_pages(paged_transport):
+    # Act
+    pages = [json_part for _, json_part in Ghutils.iter_pages("repos/octo/repo/issues")]
+    # Assert
+    assert [len(page) for page in pages] == [100, 100, 50]
+
+
+class CursorTransport(Transport):
+    """Serves 250 items, 100 per page, linking only to the next page with a cursor - no rel="last" """
+    def __init__(self):
+        self.requests = []
+
+    def request(self, method, path, body=None, headers=None):
+        self.requests.append(path)
+        cursor = int((re.search(r"[?&]after=(\d+)", path) or [None, 0])[1])
+        link = Headers()
+        if cursor + 100 < 250:
+            link['Link'] = f'<https://api.github.com/repos/octo/repo/events?per_page=100&after={cursor + 100}>; rel="next"'
+        return Response(200, 'OK', link, json.dumps([{'number': number} for number in range(cursor, min(cursor + 100, 250))]))
+
+
+@pytest.mark.ghutils
+def test_ghutils_query_github_allpages_follows_next_without_last(use_transport):
+    # Arrange
+    transport = use_transport(CursorTransport())
+    # Act
+    returncode, items = Ghutils.query_github_allpages("repos/octo/repo/events")
+    # Assert
+    assert returncode == 0
+    assert [item['number'] for item in items] == list(range(250))
+    assert transport.requests[1:] == ['repos/octo/repo/events?per_page=100&after=100', 'repos/octo/repo/events?per_page=100&after=200']
+
+
+class UsersTransport(Transport):
+    """Knows users through GraphQL - except bots, which only the REST API knows"""
+    def __init__(self):
+        self.requests = []
+
+    def request(self, method, path, body=None, headers=None):
+        self.requests.append(path)
+        if path == 'graphql':
+            variables = json.loads(body)['variables']
+            data = {alias: None if login.endswith('[bot]') else {'login': login, 'name': login.title()}
+                    for alias, login in variables.items()}
+            return Response(200, 'OK', Headers(), json.dumps({'data': data}))
+        return Response(200, 'OK', Headers(), json.dumps({'login': path.split('/')[1], 'name': None}))
+
+
+@pytest.mark.ghutils
+def test_ghutils_get_users_batches_and_caches(use_transport):
+    # Arrange
+    transport = use_transport(UsersTransport())
+    logins = ['alice', 'bob', 'carol', 'dependabot[bot]']
+    # Act
+    users = Ghutils.get_users(logins)
+    again = Ghutils.get_users(['bob', 'alice'])
+    # Assert
+    assert users['alice']['name'] == 'Alice'
+    assert users['dependabot[bot]']['name'] is None
+    assert again['bob']['name'] == 'Bob'
+    assert transport.requests == ['graphql', 'users/dependabot[bot]']
+
+
+@pytest.mark.ghutils
+def test_ghutils_get_users_looks_up_again_after_the_ttl(use_transport, monkeypatch):
+    # Arrange
+    transport = use_transport(UsersTransport())
+    monkeypatch.setattr(Ghutils, 'user_cache_ttl', 60)
+    clock = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: clock[0])
+    # Act
+    Ghutils.get_users(['alice'])
+    Ghutils.get_users(['alice'])
+    clock[0] += 61
+    Ghutils.get_users(['alice'])
+    # Assert
+    assert transport.requests == ['graphql', 'graphql']
+
+
+class FilesTransport(Transport):
+    """Has a README.md, a LICENSE too big for GraphQL and no other files"""
+    def __init__(self):
+        self.requests = []
+
+    def request(self, method, path, body=None, headers=None):
+        self.requests.append(path)
+        if path == 'graphql':
+            variables = json.loads(body)['variables']
+            blobs = {'HEAD:README.md': {'isTruncated': False, 'text': '# Hello'},
+                     'HEAD:LICENSE': {'isTruncated': True, 'text': None}}
+            data = {alias: blobs.get(expression) for alias, expression in variables.items() if alias.startswith('f')}
+            return Response(200, 'OK', Headers(), json.dumps({'data': {'repository': data}}))
+        return Response(200, 'OK', Headers(), json.dumps({'content': base64.b64encode(b'MIT').decode()}))
+
+
+@pytest.mark.ghutils
+def test_ghutils_get_files_in_one_query(use_transport):
+    # Arrange
+    transport = use_transport(FilesTransport())
+    # Act
+    files = Ghutils.get_files('octo', 'repo', ['README.md', 'LICENSE', 'CODEOWNERS'])
+    requests_before_content = list(transport.requests)
+    license_text = files['LICENSE'].content
+    # Assert
+    assert requests_before_content == ['graphql']
+    assert files['README.md'].content == '# Hello'
+    assert files['CODEOWNERS'] is None
+    assert license_text == 'MIT'
+    assert transport.requests == ['graphql', 'repos/octo/repo/contents/LICENSE']
@@ -0,0 +1,106 @@
+import os
+import sys
+import subprocess
+import pytest
+
+# Add the subdirectory containing the classes to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.localcheckout import LocalCheckout
+from classes.ghutils import Ghutils
+from classes.repo import Repo
+
+
+@pytest.fixture
+def clone(tmp_path, git_commit):
+    subprocess.run(['git', 'init', '-q', str(tmp_path)], check=True)
+    subprocess.run(['git', '-C', str(tmp_path), 'remote', 'add', 'origin', 'git@github.com:kea/local.git'], check=True)
+    git_commit(tmp_path, 'Octo Cat', '583231+octocat@users.noreply.github.com', {'README.md': '# Local\n'})
+    git_commit(tmp_path, 'Octo Cat', '583231+octocat@users.noreply.github.com', {'LICENSE': 'MIT\n'})
+    git_commit(tmp_path, 'Mona', 'mona@example.com', {'CODEOWNERS': '* @mona\n'})
+    git_commit(tmp_path, 'Someone', 'someone@example.com', {'.gitignore': '*.pyc\n'})
+    # Not committed - not in the report unless the working tree is read
+    (tmp_path / 'CONTRIBUTING.md').write_text('Be nice\n')
+    return tmp_path
+
+
+@pytest.fixture
+def shallow_clone(clone, tmp_path_factory):
+    # Like actions/checkout: only the last commit
+    path = tmp_path_factory.mktemp('shallow') / 'local'
+    subprocess.run(['git', 'clone', '-q', '--depth', '1', f"file://{clone}", str(path)], check=True)
+    return path
+
+
+@pytest.mark.localcheckout
+def test_github_repo(clone):
+    # Act & Assert
+    assert LocalCheckout(str(clone)).github_repo() == 'kea/local'
+    assert LocalCheckout.find(str(clone / '..' / 'nowhere')) is None
+
+
+@pytest.mark.localcheckout
+def test_files_from_head_and_worktree(clone):
+    # Act
+    head = LocalCheckout(str(clone)).files(['README.md', 'CONTRIBUTING.md', 'CODEOWNERS', 'missing file'])
+    worktree = LocalCheckout(str(clone), worktree=True).files(['CONTRIBUTING.md'])
+    # Assert
+    assert head['README.md'].content == '# Local\n'
+    assert head['CODEOWNERS'].content == '* @mona\n'
+    assert head['CONTRIBUTING.md'] is None and head['missing file'] is None
+    assert worktree['CONTRIBUTING.md'].content == 'Be nice\n'
+
+
+@pytest.mark.localcheckout
+def test_contributors_links_logins(clone):
+    # Arrange
+    asked = []
+    def commits():
+        asked.append(True)
+        return [{'commit': {'author': {'email': 'Mona@example.com'}}, 'author': {'login': 'mona'}},
+                {'commit': {'author': {'email': 'someone@example.com'}}, 'author': None}]
+    # Act
+    contributors = LocalCheckout(str(clone)).contributors(commits)
+    # Assert
+    assert asked == [True]
+    assert contributors == [
+        {'login': 'octocat', 'html_url': 'https://github.com/octocat', 'contributions': 2},
+        {'login': 'mona', 'html_url': 'https://github.com/mona', 'contributions': 1},
+        {'login': None, 'html_url': None, 'contributions': 1, 'name': 'Someone'}]
+
+
+@pytest.mark.localcheckout
+def test_report_reads_the_clone(clone, fake_github, capsys):
+    # Arrange
+    requests = fake_github(files=lambda owner, repo, paths: pytest.fail("the files are in the clone"))
+    # Act
+    Repo.full_report('kea', 'local', local=LocalCheckout(str(clone)))
+    # Assert
+    out = capsys.readouterr().out
+    assert requests == ['repos/kea/local/commits?per_page=100']
+    assert '[octocat](https://github.com/octocat)' in out
+    assert '_Someone_ - commits not linked to a GitHub account (1)' in out
+    assert '- [x] `CODEOWNERS` file' in out and '- [ ] `CONTRIBUTING.md` file' in out
+
+
+@pytest.mark.localcheckout
+def test_report_of_a_shallow_clone_counts_through_the_api(clone, shallow_clone, tmp_path, fake_github, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(Repo, 'mirror_dir', str(tmp_path / "mirrors"))
+    requests = fake_github(files=lambda owner, repo, paths: pytest.fail("the files are in the clone"))
+    def query_github_allpages(ghapi, die_on_error=True, record=None):
+        requests.append(ghapi)
+        return 0, record.project([{'login': 'octocat', 'html_url': 'https://github.com/octocat', 'contributions': 2},
+                                  {'login': 'mona', 'html_url': 'https://github.com/mona', 'contributions': 1}])
+    monkeypatch.setattr(Ghutils, 'query_github_allpages', query_github_allpages)
+    # Act
+    repo = Repo.build_report('kea', 'local', local=LocalCheckout(str(shallow_clone)))
+    Ghutils.take_report().close()
+    # Assert
+    assert not LocalCheckout(str(clone)).shallow and LocalCheckout(str(shallow_clone)).shallow
+    assert requests == ['repos/kea/local/contributors', 'repos/kea/local/commits']
+    assert repo.metrics()['contributors'] == 2 and repo.metrics()['commits'] == 3
+    assert repo.metrics()['community_files']['CODEOWNERS'] is True
+    assert repo.history is None
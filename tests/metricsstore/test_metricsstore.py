@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+import time
+import subprocess
+import pytest
+
+# Add the root of the repository - for the classes package - to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.metricsstore import MetricsStore
+
+REPORTREPORT = os.path.dirname(os.path.abspath(__file__))+"/../../reporeport"
+WEEK = 7 * 24 * 3600
+
+
+def metrics(commits, license=True, weeks=None):
+    metrics = {'open_issues': 1, 'closed_issues': 2, 'open_prs': 0, 'closed_prs': 3, 'contributors': 2, 'commits': commits,
+               'community_files': {'README.md': True, 'LICENSE': license}, 'pushed_at': '2023-05-01T10:00:00Z'}
+    if weeks is not None:
+        metrics['commits_per_week'] = weeks
+    return metrics
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetricsStore(str(tmp_path / 'metrics.sqlite'))
+    yield store
+    store.close()
+
+
+@pytest.mark.metricsstore
+def test_latest_and_missing(store):
+    now = time.time()
+    store.record('org/a', metrics(10, license=False), now - WEEK)
+    store.record('org/a', metrics(12), now)
+    store.record('org/b', metrics(5, license=False), now)
+    store.record('other/c', metrics(1), now)
+
+    assert store.repos() == ['org/a', 'org/b', 'other/c']
+    assert store.repos('ORG/*') == ['org/a', 'org/b']
+    assert store.repos(repos=['org/b', 'org/unknown']) == ['org/b']
+    latest = store.latest(['org/a', 'org/b'])
+    assert [(row['repo'], row['commits']) for row in latest] == [('org/a', 12), ('org/b', 5)]
+    assert latest[0]['community_files'] == {'README.md': True, 'LICENSE': True}
+    # Only the last run counts
+    assert store.missing(store.repos(), 'LICENSE') == ['org/b']
+    assert store.missing(store.repos(), 'CODEOWNERS') == ['org/a', 'org/b', 'other/c']
+
+
+@pytest.mark.metricsstore
+def test_weekly_activity(store):
+    now = time.time()
+    this_week, last_week = MetricsStore.week(now), MetricsStore.week(now - WEEK)
+    # From the history of a mirror
+    store.record('org/mirrored', metrics(30, weeks={last_week: 4, this_week: 6}), now)
+    # From the growth of the commit count between runs
+    store.record('org/counted', metrics(10), now - 2 * WEEK)
+    store.record('org/counted', metrics(13), now - WEEK)
+    store.record('org/counted', metrics(20), now)
+
+    labels, activity = store.weekly_activity(store.repos(), weeks=3, now=now)
+    assert labels[-2:] == [last_week, this_week] and len(labels) == 3
+    assert activity['org/mirrored'] == [0, 4, 6]
+    assert activity['org/counted'] == [None, 3, 7]
+    markdown = MetricsStore.to_markdown(store.aggregate(store.repos(), 'activity', weeks=3))
+    assert '| **All** | 0 | 7 | 13 | 20 |' in markdown
+
+
+@pytest.mark.metricsstore
+def test_aggregate_command(tmp_path):
+    store = MetricsStore(str(tmp_path / 'metrics.sqlite'))
+    for index in range(50):
+        store.record(f"class/repo{index:02d}", metrics(index, license=index % 10 != 0))
+    store.close()
+    with open(tmp_path / 'repos.txt', 'w') as f:
+        f.write("class/repo00\nclass/repo01\n")
+
+    def aggregate(*args):
+        # No token, no network - the store has to be enough
+        env = dict(os.environ, GH_TOKEN='', GITHUB_TOKEN='', PATH='')
+        return subprocess.run([sys.executable, REPORTREPORT, 'aggregate', '--cache-dir', str(tmp_path)] + list(args),
+                              capture_output=True, text=True, check=True, env=env).stdout
+
+    missing = json.loads(aggregate('--view', 'missing', '--path', 'LICENSE', '--format', 'json'))
+    assert missing['repos'] == ['class/repo00', 'class/repo10', 'class/repo20', 'class/repo30', 'class/repo40']
+    summary = aggregate('--file', str(tmp_path / 'repos.txt'))
+    assert '| class/repo01 | 1 | 2 | 0 | 3 | 2 | 1 |' in summary
+    assert '- LICENSE: 1 - class/repo00' in summary
+    assert 'repo02' not in summary
+
+    # Answered from the store alone
+    store = MetricsStore(str(tmp_path / 'metrics.sqlite'))
+    started = time.perf_counter()
+    store.aggregate(store.repos(), 'summary')
+    assert time.perf_counter() - started < 0.1
+    store.close()
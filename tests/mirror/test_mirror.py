@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+# Add the subdirectory containing the classes to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.mirror import RepoMirror
+from classes.repo import Repo
+
+
+@pytest.fixture
+def upstream(tmp_path, git_commit):
+    path = tmp_path / "upstream"
+    subprocess.run(['git', 'init', '-q', str(path)], check=True)
+    git_commit(path, 'Octo Cat', 'octocat@users.noreply.github.com', {'README.md': 'one\ntwo\n'}, '2023-06-01T10:00:00Z')
+    git_commit(path, 'Mona', 'mona@example.com', {'README.md': 'one\n', 'LICENSE': 'MIT\n'}, '2023-07-01T10:00:00Z')
+    return path
+
+
+@pytest.mark.mirror
+def test_history_is_updated_incrementally(upstream, tmp_path, git_commit):
+    # Arrange
+    mirror = RepoMirror(str(tmp_path / "mirrors"), 'kea', 'upstream', url=str(upstream))
+    mirror.update()
+    first = mirror.history()
+    git_commit(upstream, 'Mona', 'mona@example.com', {'LICENSE': 'MIT\nreally\n'}, '2023-07-02T10:00:00Z')
+    # Act
+    mirror.update()
+    second = mirror.history()
+    # Assert
+    assert first['authors']['octocat@users.noreply.github.com'] == {'name': 'Octo Cat', 'commits': 1, 'additions': 2, 'deletions': 0}
+    assert first['months'] == {'2023-06': 1, '2023-07': 1}
+    assert second['authors']['mona@example.com'] == {'name': 'Mona', 'commits': 2, 'additions': 2, 'deletions': 1}
+    assert second['months'] == {'2023-06': 1, '2023-07': 2}
+    assert json.loads(open(mirror.history_file).read())['head'] == second['head']
+
+
+@pytest.mark.mirror
+def test_rewritten_history_is_read_again(upstream, tmp_path):
+    # Arrange
+    mirror = RepoMirror(str(tmp_path / "mirrors"), 'kea', 'upstream', url=str(upstream))
+    mirror.update()
+    mirror.history()
+    subprocess.run(['git', '-C', str(upstream), 'reset', '-q', '--hard', 'HEAD~1'], check=True)
+    # Act
+    mirror.update()
+    history = mirror.history()
+    # Assert
+    assert list(history['authors']) == ['octocat@users.noreply.github.com']
+
+
+@pytest.mark.mirror
+def test_report_with_mirror(upstream, tmp_path, monkeypatch, fake_github, capsys):
+    # Arrange
+    monkeypatch.setattr(Repo, 'mirror_dir', str(tmp_path / "mirrors"))
+    monkeypatch.setattr(RepoMirror, 'open', lambda directory, org, name: (lambda mirror: mirror.update() or mirror)(RepoMirror(directory, org, name, url=str(upstream))))
+    fake_github(query_github=lambda ghapi: (0, [{'commit': {'author': {'email': 'mona@example.com'}}, 'author': {'login': 'mona'}}]),
+                files=lambda owner, repo, paths: pytest.fail("the files are in the mirror"))
+    # Act
+    Repo.full_report('kea', 'upstream')
+    # Assert
+    out = capsys.readouterr().out
+    assert '"octocat" : 1' in out and '"mona" : 1' in out
+    assert '### Activity' in out
+    assert '| [mona](https://github.com/mona) | 1 | 1 | 1 |' in out
+    assert '- [x] `LICENSE` file' in out
@@ -0,0 +1,80 @@
+import os
+import sys
+import tracemalloc
+import pytest
+
+# Add the root of the repository - for the classes package - and the synthetic GitHub of the benchmarks to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../bench"
+)
+
+from classes.records import IssueRecord, ContributorRecord
+from classes.ghutils import Ghutils
+from classes.repo import Repo
+from synthetic import SyntheticGitHub
+
+
+@pytest.fixture
+def synthetic(use_transport):
+    return use_transport(SyntheticGitHub(issues=3000, prs=1000))
+
+
+@pytest.mark.records
+def test_record_reads_like_a_dict():
+    # Arrange
+    issue = IssueRecord.from_json({'number': 7, 'title': 'Report', 'state': 'open', 'user': {'login': 'octocat'},
+                                   'pull_request': {'url': 'https://api.github.com/repos/kea/x/pulls/7'}})
+    # Act & Assert
+    assert issue['number'] == 7 and issue.title == 'Report'
+    assert 'pull_request' in issue and 'updated_at' not in issue and 'user' not in issue
+    assert issue.get('updated_at', 'never') == 'never'
+    assert issue.to_dict() == {'number': 7, 'title': 'Report', 'state': 'open', 'pull_request': True}
+    with pytest.raises(KeyError):
+        issue['user']
+    with pytest.raises(AttributeError):
+        issue.title = 'Changed'
+    assert not hasattr(ContributorRecord.from_json({'login': 'octocat'}), '__dict__')
+
+
+@pytest.mark.records
+def test_pages_are_projected(synthetic):
+    # Act
+    tracemalloc.start()
+    _, raw = Ghutils.query_github_allpages("repos/kea/synthetic/issues?state=all")
+    raw_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tracemalloc.start()
+    _, records = Ghutils.query_github_allpages("repos/kea/synthetic/issues?state=all", record=IssueRecord)
+    records_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Assert
+    assert [record['number'] for record in records] == [issue['number'] for issue in raw]
+    assert Ghutils.get_element_count(records, 'state', 'closed') == Ghutils.get_element_count(raw, 'state', 'closed')
+    assert Ghutils.get_element_by_regex(records, 'title', r"^Issue 42$") == IssueRecord.from_json(raw[-42])
+    assert records_size * 4 < raw_size
+
+
+@pytest.mark.records
+def test_repo_keeps_records(synthetic):
+    # Arrange
+    repo = Repo('kea', 'synthetic')
+    # Act
+    number = repo.get_issue_by_title(r"^Issue 1$")
+    # Assert
+    assert number == 1
+    assert all(isinstance(issue, IssueRecord) for issue in repo.issues)
+    assert all(isinstance(contributor, ContributorRecord) for contributor in repo.contributors)
+
+
+@pytest.mark.records
+def test_all_contributors_are_counted(use_transport):
+    # Arrange - more than the 30 on the first page of the contributors API
+    use_transport(SyntheticGitHub(contributors=250))
+    # Act
+    metrics = Repo('kea', 'synthetic').metrics()
+    # Assert
+    assert metrics['contributors'] == 250
+    assert metrics['commits'] == sum(1000 - number for number in range(250))
@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import pytest
+
+# Add the subdirectory containing the classes to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.repo import Repo
+from classes.ghutils import Ghutils
+from classes.issueindex import IssueIndex
+from classes.transport import Transport, Response, Headers
+
+
+@pytest.fixture
+def offline_github(fake_github, monkeypatch):
+    """Answer the GitHub queries with canned data - the slow repo answers last"""
+    def query_github(ghapi):
+        if "slow" in ghapi:
+            time.sleep(0.2)
+        return 0, []
+
+    def query_github_allpages(ghapi, die_on_error=True, record=None):
+        requests.append(ghapi)
+        if not ghapi.endswith("/contributors"):
+            pytest.fail(f"{ghapi} isn't needed for the report")
+        return 0, record.project([{'login': 'octocat', 'html_url': 'https://github.com/octocat', 'contributions': 3}])
+
+    requests = fake_github(query_github=query_github, name='The Octocat')
+    monkeypatch.setattr(Ghutils, 'query_github_allpages', query_github_allpages)
+    monkeypatch.setattr(Ghutils, 'query_graphql', lambda query, variables=None, die_on_error=True: (1, "Error: offline graphql"))
+    return requests
+
+
+@pytest.mark.repo
+def test_full_reports_keeps_order_and_separates_output(offline_github, capsys):
+    # Act
+    Repo.full_reports(["org/slow", "org/fast", "org/other"], jobs=3)
+    reports = capsys.readouterr().out.split("## [org]")
+    # Assert
+    assert len(reports) == 4
+    assert "[slow]" in reports[1] and "fast" not in reports[1]
+    assert "[fast]" in reports[2] and "slow" not in reports[2]
+    assert "[other]" in reports[3]
+    assert all(report.count("### Community standards") == 1 for report in reports[1:])
+
+
+@pytest.mark.repo
+def test_full_report_twice_in_one_process(offline_github, tmp_path):
+    # Act
+    Repo.full_report("org", "first", str(tmp_path / "first.md"))
+    Repo.full_report("org", "second", str(tmp_path / "second.md"))
+    # Assert
+    assert "first" in (tmp_path / "first.md").read_text()
+    assert "second" in (tmp_path / "second.md").read_text()
+    assert "first" not in (tmp_path / "second.md").read_text()
+
+
+@pytest.mark.repo
+def test_failed_report_keeps_the_last_one(offline_github, monkeypatch, tmp_path):
+    # Arrange
+    report = tmp_path / "report.md"
+    Repo.full_report("org", "repo", str(report))
+    good = report.read_text()
+    def fail(owner, repo):
+        sys.exit(1)
+    monkeypatch.setattr(Ghutils, 'get_issue_pr_counts', fail)
+    # Act
+    with pytest.raises(SystemExit):
+        Repo.full_report("org", "repo", str(report))
+    Ghutils.take_report().close()
+    # Assert
+    assert report.read_text() == good
+    assert os.listdir(tmp_path) == ["report.md"]
+
+
+@pytest.mark.repo
+def test_summary_uses_counts_only(offline_github, capsys):
+    # Act
+    Repo.full_report("org", "repo")
+    # Assert
+    out = capsys.readouterr().out
+    assert '"Issues: open" : 1' in out
+    assert '"PRs :closed" : 4' in out
+
+
+@pytest.mark.repo
+def test_incremental_run_reuses_snapshot_and_keeps_unchanged_file(offline_github, tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(Repo, 'snapshot_dir', str(tmp_path / "snapshots"))
+    report = tmp_path / "report.md"
+    Repo.full_report("org", "repo", str(report))
+    first_requests = list(offline_github)
+    os.utime(report, (0, 0))
+    # Act
+    Repo.full_report("org", "repo", str(report))
+    # Assert
+    assert "repos/org/repo/contributors" in first_requests
+    assert offline_github[len(first_requests):] == []
+    assert report.stat().st_mtime == 0
+
+
+class IssuesTransport(Transport):
+    """Knows the report issue of org/repo - found by search, read, updated and created through the API"""
+    def __init__(self, number=None):
+        self.number = number
+        self.requests = []
+
+    def request(self, method, path, body=None, headers=None):
+        self.requests.append((method, path.split('?')[0]))
+        issue = {'number': self.number, 'title': 'org/repo - Report', 'state': 'closed', 'html_url': f'https://github.com/org/repo/issues/{self.number}'}
+        if path.startswith('search/issues'):
+            items = [{'number': 3, 'title': 'org/repo - Report draft', 'state': 'open'}] + ([issue] if self.number else [])
+            return Response(200, 'OK', Headers(), json.dumps({'total_count': len(items), 'items': items}))
+        if method == 'GET' and path == f'repos/org/repo/issues/{self.number}':
+            return Response(200, 'OK', Headers(), json.dumps(issue))
+        if method == 'PATCH' and path == f'repos/org/repo/issues/{self.number}':
+            assert json.loads(body) == {'body': 'The report', 'state': 'open'}
+            return Response(200, 'OK', Headers(), json.dumps(issue))
+        if method == 'POST' and path == 'repos/org/repo/issues':
+            self.number = 99
+            return Response(201, 'Created', Headers(), json.dumps({**issue, 'number': 99, **json.loads(body)}))
+        return Response(404, 'Not Found', Headers(), json.dumps({'message': 'Not Found'}))
+
+
+def report_repo():
+    repo = Repo.__new__(Repo)
+    repo.org_name, repo.repo_name, repo.snapshot = 'org', 'repo', None
+    repo.issue_title_template = 'org/repo - Report'
+    return repo
+
+
+@pytest.mark.repo
+@pytest.mark.parametrize('number', [42, None])
+def test_update_issue_takes_constant_requests(tmp_path, monkeypatch, use_transport, number):
+    # Arrange
+    transport = use_transport(IssuesTransport(number))
+    monkeypatch.setattr(Repo, 'issue_index', IssueIndex(str(tmp_path / "issues.json")))
+    # Act
+    first = report_repo().update_issue('The report')
+    first_requests = list(transport.requests)
+    second = report_repo().update_issue('The report')
+    # Assert
+    number = number or 99
+    assert first == 0 and second == 0
+    assert [method for method, _ in first_requests] == ['GET', 'PATCH' if number == 42 else 'POST']
+    assert transport.requests[len(first_requests):] == [('GET', f'repos/org/repo/issues/{number}'), ('PATCH', f'repos/org/repo/issues/{number}')]
+    assert Repo.issue_index.get('org/repo') == number
@@ -0,0 +1,44 @@
+import io
+import os
+import sys
+import pytest
+
+# Add the subdirectory containing the classes to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.reportwriter import ReportWriter
+
+
+@pytest.mark.reportwriter
+def test_appendix_goes_last_and_main_part_is_streamed():
+    # Arrange
+    sink = io.StringIO()
+    writer = ReportWriter(sink)
+    # Act
+    writer.write("## summary\n")
+    writer.write_appendix("<details>license</details>\n")
+    streamed_before_finish = sink.getvalue()
+    writer.write("### contributors\n")
+    writer.finish()
+    # Assert
+    assert streamed_before_finish == "## summary\n"
+    assert sink.getvalue() == "## summary\n### contributors\n<details>license</details>\n"
+
+
+@pytest.mark.reportwriter
+def test_big_reports_are_spooled_to_disk():
+    # Arrange
+    writer = ReportWriter(spool_size=1024)
+    # Act
+    for number in range(1000):
+        writer.write_appendix(f"line {number}\n")
+    writer.write("## summary\n")
+    # Assert
+    assert writer.sink._rolled is False
+    content = writer.read()
+    assert writer.sink._rolled is True
+    assert content.startswith("## summary\nline 0\n")
+    assert content.endswith("line 999\n")
+    writer.close()
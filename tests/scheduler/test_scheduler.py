@@ -0,0 +1,124 @@
+import os
+import sys
+import pytest
+
+# Add the subdirectory containing the classes to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.transport import Transport, Response, Headers
+from classes.scheduler import RequestScheduler
+
+
+class ScriptedTransport(Transport):
+    """Answers with the scripted responses, one after the other"""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = 0
+
+    def request(self, method, path, body=None, headers=None):
+        self.requests += 1
+        return self.responses.pop(0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def ok(remaining='4000', reset='4600'):
+    return Response(200, 'OK', Headers({'X-RateLimit-Limit': '5000', 'X-RateLimit-Remaining': remaining, 'X-RateLimit-Reset': reset}), '{}')
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.mark.scheduler
+def test_retry_after_is_respected(clock):
+    # Arrange
+    transport = ScriptedTransport([Response(429, 'Too Many Requests', Headers({'Retry-After': '7'}), ''), ok()])
+    scheduler = RequestScheduler(transport, sleep=clock.sleep, clock=clock.time)
+    # Act
+    response = scheduler.request('GET', 'repos/octo/repo')
+    # Assert
+    assert response.status == 200
+    assert response.retries == 1
+    assert clock.sleeps == [7.0]
+
+
+@pytest.mark.scheduler
+def test_server_errors_are_retried_with_backoff(clock):
+    # Arrange
+    error = Response(502, 'Bad Gateway', Headers(), '')
+    transport = ScriptedTransport([error, error, ok()])
+    scheduler = RequestScheduler(transport, sleep=clock.sleep, clock=clock.time)
+    # Act
+    response = scheduler.request('GET', 'repos/octo/repo')
+    # Assert
+    assert response.status == 200
+    assert len(clock.sleeps) == 2
+    assert 0.5 <= clock.sleeps[0] <= 1.5
+    assert 1.0 <= clock.sleeps[1] <= 3.0
+
+
+@pytest.mark.scheduler
+def test_server_errors_are_not_retried_for_writes(clock):
+    # Arrange - the issue may have been created before the 502
+    error = Response(502, 'Bad Gateway', Headers(), '')
+    transport = ScriptedTransport([error, error, ok(), Response(429, 'Too Many Requests', Headers({'Retry-After': '7'}), ''), ok()])
+    scheduler = RequestScheduler(transport, sleep=clock.sleep, clock=clock.time)
+    # Act
+    created = scheduler.request('POST', 'repos/octo/repo/issues', '{"title": "Report"}')
+    queried = scheduler.request('POST', 'graphql', '{"query": "query { viewer { login } }"}')
+    limited = scheduler.request('PATCH', 'repos/octo/repo/issues/1', '{"body": "Report"}')
+    # Assert
+    assert created.status == 502 and created.retries == 0
+    assert queried.status == 200 and queried.retries == 1
+    # Rate limited requests weren't done - they are retried whatever the method
+    assert limited.status == 200 and limited.retries == 1
+    assert not RequestScheduler.idempotent('POST', 'graphql', '{"query": "mutation { addStar }"}')
+
+
+@pytest.mark.scheduler
+def test_exhausted_budget_waits_for_the_reset(clock):
+    # Arrange
+    transport = ScriptedTransport([ok(remaining='0', reset='1100'), ok()])
+    scheduler = RequestScheduler(transport, sleep=clock.sleep, clock=clock.time)
+    # Act
+    scheduler.request('GET', 'repos/octo/repo')
+    scheduler.request('GET', 'repos/octo/repo')
+    # Assert
+    assert clock.sleeps == [101.0]
+
+
+@pytest.mark.scheduler
+def test_low_budget_is_spread_until_the_reset(clock):
+    # Arrange - 10 requests left for 100 seconds
+    transport = ScriptedTransport([ok(remaining='10', reset='1100') for _ in range(3)])
+    scheduler = RequestScheduler(transport, sleep=clock.sleep, clock=clock.time)
+    # Act
+    for _ in range(3):
+        scheduler.request('GET', 'repos/octo/repo')
+    # Assert - the second request gets the first slot, the third one waits for the next
+    assert clock.sleeps == [pytest.approx(10.0)]
+
+
+@pytest.mark.scheduler
+def test_projection_includes_the_wait_for_the_reset(clock):
+    # Arrange
+    scheduler = RequestScheduler(ScriptedTransport([ok(remaining='100', reset='2800')]), sleep=clock.sleep, clock=clock.time)
+    scheduler.request('GET', 'repos/octo/repo')
+    # Act / Assert
+    assert scheduler.projection(50) < 1
+    assert scheduler.projection(200) >= 1800
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import socket
+import http.client
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+# Add the root of the repository - for the classes package - and the synthetic GitHub of the benchmarks to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../bench"
+)
+
+from classes.ghutils import Ghutils
+from classes.server import ReportServer
+from classes.replay import ReplayTransport
+from classes.mirror import RepoMirror
+from classes.snapshot import RepoSnapshot
+from synthetic import SyntheticGitHub
+
+
+@pytest.fixture
+def synthetic():
+    transport = ReplayTransport(fallback=SyntheticGitHub(), latency=0.02)
+    Ghutils.set_transport(transport)
+    Ghutils.clear_user_cache()
+    yield transport
+    Ghutils.set_transport(None)
+    Ghutils.clear_user_cache()
+
+
+@pytest.mark.server
+def test_refresh_looks_up_the_users_again(synthetic, monkeypatch):
+    # Arrange
+    with ReportServer(port=0) as server:
+        url = f"{server.url}/report/kea/synthetic"
+        before = urllib.request.urlopen(url).read().decode('utf-8')
+        # user0 fixes the name on GitHub
+        graphql = synthetic.fallback.graphql
+        monkeypatch.setattr(synthetic.fallback, 'graphql', lambda query, variables: {
+            alias: dict(user, name='Fixed Name') if user.get('login') == 'user0' else user for alias, user in graphql(query, variables).items()}
+            if 'user(login:' in query else graphql(query, variables))
+        # Act
+        cached = urllib.request.urlopen(url).read().decode('utf-8')
+        refreshed = urllib.request.urlopen(f"{url}?refresh=1").read().decode('utf-8')
+    # Assert
+    assert '_User0_' in before and cached == before
+    assert '_Fixed Name_' in refreshed
+    assert Ghutils.user_cache_ttl is None
+
+
+class UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__('localhost')
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+@pytest.mark.server
+def test_concurrent_requests_share_one_build(synthetic):
+    # Arrange
+    with ReportServer(port=0) as server:
+        url = f"{server.url}/report/kea/synthetic"
+        # Act
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            reports = list(executor.map(lambda _: urllib.request.urlopen(url).read().decode('utf-8'), range(5)))
+        with urllib.request.urlopen(f"{url}?format=json") as response:
+            report = json.loads(response.read())
+    # Assert
+    assert all(text.startswith("## [kea](https://github.com/kea)/[synthetic]") for text in reports)
+    assert len(set(reports)) == 1
+    assert synthetic.requests.count(('GET', 'repos/kea/synthetic')) == 1
+    assert report['report'] == reports[0]
+    assert report['metrics']['open_issues'] + report['metrics']['closed_issues'] == 10
+    assert report['metrics']['community_files']['CONTRIBUTE.md'] is False
+
+
+@pytest.mark.server
+def test_unix_socket_and_errors(synthetic, tmp_path):
+    # Arrange
+    path = str(tmp_path / "reporeport.sock")
+    with ReportServer(socket_path=path) as server:
+        mode = os.stat(path).st_mode & 0o777
+        connection = UnixConnection(path)
+        # Act
+        connection.request('GET', '/report/kea/missing')
+        missing = connection.getresponse()
+        missing_body = json.loads(missing.read())
+        connection.request('GET', '/health')
+        health = json.loads(connection.getresponse().read())
+        connection.close()
+    # Assert
+    assert mode == 0o600
+    assert missing.status == 502 and 'kea/missing' in missing_body['error']
+    assert health['status'] == 'ok'
+    assert not os.path.exists(path)
+
+
+@pytest.mark.server
+def test_names_cannot_lead_out_of_the_cache_directory(synthetic, tmp_path):
+    # Arrange
+    with ReportServer(port=0) as server:
+        connection = http.client.HTTPConnection(server.url[len('http://'):])
+        # Act
+        statuses = []
+        for path in ['/report/..%2F..%2F..%2Ftmp%2Fx/y', '/report/kea/..', '/report/kea/a%00b']:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            statuses.append(response.status)
+        connection.close()
+    # Assert
+    assert statuses == [400, 400, 400]
+    assert synthetic.requests == []
+    for org, repo in [('../../../tmp/x', 'y'), ('kea', '../x'), ('.', 'x'), ('kea/more', 'x')]:
+        with pytest.raises(ValueError):
+            RepoMirror(str(tmp_path), org, repo)
+        with pytest.raises(ValueError):
+            RepoSnapshot(str(tmp_path), org, repo)
+    assert RepoMirror.open(str(tmp_path), '..', 'x') is None
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.server
+@pytest.mark.parametrize('watch', [[], ['kea/synthetic']])
+def test_old_reports_are_dropped_unless_watched(synthetic, watch):
+    # Arrange
+    with ReportServer(port=0, max_age=0.2, watch=watch) as server:
+        server.report('kea', 'synthetic')
+        time.sleep(0.3)
+        # Act
+        with pytest.raises(RuntimeError):
+            server.report('kea', 'missing')
+        # Assert
+        assert server.health()['reports'] == watch
+
+
+@pytest.mark.server
+def test_watched_repositories_are_built_in_the_background(synthetic):
+    # Arrange
+    with ReportServer(port=0, watch=['kea/synthetic'], refresh=0.1) as server:
+        # Act
+        deadline = time.time() + 5
+        while server.health()['reports'] == [] and time.time() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.3)
+        with urllib.request.urlopen(f"{server.url}/report/kea/synthetic") as response:
+            age = int(response.headers['X-Report-Age'])
+    # Assert
+    assert server.health()['reports'] == ['kea/synthetic']
+    assert synthetic.requests.count(('GET', 'repos/kea/synthetic')) >= 2
+    assert age < 1
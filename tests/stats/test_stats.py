@@ -0,0 +1,69 @@
+import os
+import sys
+import json
+import pytest
+
+# Add the root of the repository - for the classes package - and the synthetic GitHub of the benchmarks - to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../bench"
+)
+
+from classes.ghutils import Ghutils
+from classes.repo import Repo
+from classes.stats import Stats
+from classes.replay import ReplayTransport
+from synthetic import SyntheticGitHub
+
+
+@pytest.fixture
+def synthetic():
+    Ghutils.set_transport(ReplayTransport(fallback=SyntheticGitHub()))
+    Ghutils.clear_user_cache()
+    yield
+    Stats.disable()
+    Ghutils.set_transport(None)
+    Ghutils.clear_user_cache()
+
+
+@pytest.mark.stats
+def test_disabled_records_nothing(synthetic):
+    # Arrange
+    Stats.enable()
+    Stats.disable()
+    # Act
+    Repo.build_report('kea', 'synthetic')
+    Ghutils.take_report().close()
+    # Assert
+    assert Stats.events() == []
+
+
+@pytest.mark.stats
+def test_requests_and_sections(synthetic, tmp_path):
+    # Arrange
+    Stats.enable()
+    # Act
+    Repo.build_report('kea', 'synthetic')
+    Ghutils.take_report().close()
+    Stats.export(str(tmp_path / "trace.json"), 'trace')
+    # Assert
+    events = Stats.events()
+    requests = [event for event in events if event['kind'] == 'request']
+    sections = {event['name'] for event in events if event['kind'] == 'section'}
+    assert requests and all(event['bytes'] > 0 and event['rate_limit_remaining'] is not None for event in requests)
+    assert {'Repo.md_repo kea/synthetic', 'Repo.md_contributors kea/synthetic', 'Repo.md_community_standards kea/synthetic'} <= sections
+    summary = Stats.summary()
+    assert f"Requests: {len(requests)}" in summary
+    assert "GET repos/{}/{}" in summary
+    trace = json.loads((tmp_path / "trace.json").read_text())['traceEvents']
+    assert len(trace) == len(events) and all(event['ph'] == 'X' for event in trace)
+
+
+@pytest.mark.stats
+def test_endpoint():
+    # Act & Assert
+    assert Stats.endpoint('repos/kea/synthetic/issues?state=all&page=3') == 'repos/{}/{}/issues?state={}&page={}'
+    assert Stats.endpoint('users/octocat') == 'users/{}'
+    assert Stats.endpoint('graphql') == 'graphql'
@@ -0,0 +1,116 @@
+import os
+import sys
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the subdirectory containing the classes to the general class_path
+sys.path.append(
+    os.path.dirname(os.path.abspath(__file__))+"/../.."
+)
+
+from classes.transport import HttpTransport, GhCliTransport
+from classes.ghutils import Ghutils
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.clients.add(self.client_address)
+        self.server.authorizations.add(self.headers.get('Authorization'))
+        if self.path.startswith('/repos/octo/flaky') and self.server.dropped.setdefault(self.path, 0) == 0:
+            self.drop()
+            return
+        if self.path.startswith('/repos/octo/missing'):
+            status, body = 404, {'message': 'Not Found'}
+        else:
+            status, body = 200, {'path': self.path}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('ETag', '"abc"')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.drop()
+
+    def drop(self):
+        # Hang up without an answer - as a server going away while handling the request
+        self.server.dropped[self.path] = self.server.dropped.get(self.path, 0) + 1
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.clients = set()
+    server.authorizations = set()
+    server.dropped = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def http_transport(stub_server):
+    transport = HttpTransport(token='secret', base_url=f"http://127.0.0.1:{stub_server.server_address[1]}")
+    Ghutils.set_transport(transport)
+    yield transport
+    Ghutils.set_transport(None)
+    transport.close()
+
+
+@pytest.mark.transport
+def test_http_transport_reuses_connection(stub_server, http_transport):
+    # Act
+    for number in range(5):
+        returncode, body = Ghutils.query_github(f"repos/octo/repo{number}")
+        assert returncode == 0
+        assert body['path'] == f"/repos/octo/repo{number}"
+    # Assert
+    assert http_transport.connections_opened == 1
+    assert len(stub_server.clients) == 1
+    assert stub_server.authorizations == {'Bearer secret'}
+
+
+@pytest.mark.transport
+def test_http_transport_error_and_headers(stub_server, http_transport):
+    # Act
+    returncode, body, headers = Ghutils.query_github_incl_header("repos/octo/missing", False)
+    # Assert
+    assert returncode == 1
+    assert headers['Status-Code'] == '404'
+    assert 'Not Found (HTTP 404)' in body
+    assert headers['Etag'] == '"abc"'
+
+
+@pytest.mark.transport
+def test_http_transport_resends_only_what_can_be_sent_twice(stub_server, http_transport):
+    # Act
+    flaky = http_transport.request('GET', 'repos/octo/flaky')
+    with pytest.raises(ConnectionResetError):
+        http_transport.request('POST', 'repos/octo/repo/issues', '{"title": "Report"}')
+    # Assert
+    assert flaky.status == 200
+    assert stub_server.dropped == {'/repos/octo/flaky': 1, '/repos/octo/repo/issues': 1}
+
+
+@pytest.mark.transport
+def test_gh_cli_output_is_parsed():
+    # Act
+    response = GhCliTransport.parse_output(1, 'HTTP/2.0 404 Not Found\nEtag: "x"\n\n{"message": "Not Found"}', 'gh: Not Found (HTTP 404)\n')
+    # Assert
+    assert response.status == 404
+    assert response.headers['ETag'] == '"x"'
+    assert response.json() == {'message': 'Not Found'}
+    assert response.error == 'gh: Not Found (HTTP 404)'